@@ -0,0 +1,218 @@
+"""Budget search and installment schedules over the phone catalog.
+
+"Which phone can a customer get with a 100,000 kianzio and 15,000 a week?"
+is a range query on the price columns. `AffordabilityIndex` is built once per
+catalog version: every price field becomes a column array plus a sorted copy
+with the rows in that order, so a limit on one field is a bisect. The most
+selective indexed limit picks the candidate rows and the other limits are
+array comparisons on those rows only. `installments` works out another
+down payment or term for every model at once.
+"""
+import re
+import threading
+from bisect import bisect_right
+from typing import Dict, List, NamedTuple, Optional, Text
+
+import numpy as np
+
+from .catalog import PRICE_FIELDS, PhoneCatalog
+
+# A day's payment is rounded up to this, like the catalog's own schedules
+ROUND_TO = 100
+DAYS_PER_WEEK = 7
+DAYS_PER_MONTH = 30
+
+# Words that say which field an amount in a message limits, matched as whole
+# tokens so that e.g. "download" or "weekend" limit nothing
+FIELD_WORDS = {
+    "kianzio": ("kianzio", "vianzio", "deposit", "deposits", "down", "downpayment"),
+    "siku": ("siku", "day", "days", "daily"),
+    "wiki": ("wiki", "week", "weeks", "weekly"),
+    "mwezi": ("mwezi", "miezi", "month", "months", "monthly"),
+    "bei": ("bei", "price", "prices", "budget", "bajeti", "cash", "taslimu"),
+}
+_WORD_FIELDS = {word: field for field, words in FIELD_WORDS.items() for word in words}
+# A small number next to one of these is a term: "siku 90", "6 months"
+TERM_DAYS = {"siku": 1, "days": 1, "wiki": DAYS_PER_WEEK, "weeks": DAYS_PER_WEEK,
+             "miezi": DAYS_PER_MONTH, "months": DAYS_PER_MONTH}
+# Amounts are at least this; smaller numbers are terms or model names
+MIN_AMOUNT = 1000
+# Words that separate one limit from the next: "kianzio 100,000 na 15,000 kwa wiki"
+CLAUSE_BREAKS = frozenset(["na", "and", "au", "or", "pia", "plus", ",", ";"])
+
+_BUDGET_TOKEN = re.compile(r"\b\d+(?:[.,]\d+)*k?\b|[a-z]+|[,;]")
+
+
+class ColumnIndex(NamedTuple):
+    values: np.ndarray
+    rows: np.ndarray
+
+
+class Budget(NamedTuple):
+    limits: Dict[Text, int]
+    brand: Optional[Text] = None
+    days: Optional[int] = None
+
+
+class Schedule(NamedTuple):
+    kianzio: np.ndarray
+    siku: np.ndarray
+    wiki: np.ndarray
+    mwezi: np.ndarray
+
+
+class AffordabilityIndex:
+    def __init__(self, catalog: PhoneCatalog) -> None:
+        self.version = catalog.version
+        self.models: List[Text] = list(catalog.phones)
+        self.rows: Dict[Text, int] = {model: row for row, model in enumerate(self.models)}
+        self.brand_names: List[Text] = sorted({info.brand for info in catalog.phones.values()})
+        brand_codes = {brand: code for code, brand in enumerate(self.brand_names)}
+        self.brands = np.array([brand_codes[catalog.phones[model].brand] for model in self.models], dtype=np.int32)
+        self.columns: Dict[Text, np.ndarray] = {
+            field: np.array([getattr(catalog.phones[model], field) for model in self.models], dtype=np.int64)
+            for field in PRICE_FIELDS
+        }
+        self.indexes: Dict[Text, ColumnIndex] = {}
+        for field, column in self.columns.items():
+            rows = np.argsort(column, kind="stable")
+            self.indexes[field] = ColumnIndex(column[rows], rows)
+
+    def rows_at_most(self, field: Text, limit: int) -> np.ndarray:
+        index = self.indexes[field]
+        return index.rows[:bisect_right(index.values, limit)]
+
+    def search(self, limits: Dict[Text, int], brand: Optional[Text] = None, sort: Text = "bei",
+               limit: Optional[int] = 10, schedule: Optional[Schedule] = None) -> List[Text]:
+        """Models within every limit (field -> maximum), cheapest first.
+
+        With a `schedule` from `installments`, the installment limits apply to
+        it instead of the catalog's payments. A kianzio limit is always checked
+        against the catalog's kianzio, the least a model can be taken for.
+        """
+        columns = dict(self.columns)
+        if schedule is not None:
+            columns.update(siku=schedule.siku, wiki=schedule.wiki, mwezi=schedule.mwezi)
+        indexed = [field for field in limits if columns[field] is self.columns[field]]
+        if indexed:
+            first = min(indexed, key=lambda field: bisect_right(self.indexes[field].values, limits[field]))
+            rows = self.rows_at_most(first, limits[first])
+        else:
+            first, rows = None, np.arange(len(self.models))
+        for field, value in limits.items():
+            if field != first and len(rows):
+                rows = rows[columns[field][rows] <= value]
+        if brand is not None:
+            if brand not in self.brand_names:
+                return []
+            rows = rows[self.brands[rows] == self.brand_names.index(brand)]
+        # Equal prices keep catalog order
+        rows = rows[np.lexsort((rows, columns[sort][rows]))]
+        return [self.models[row] for row in rows[:limit]]
+
+    def installments(self, down_payment: Optional[int] = None, days: Optional[int] = None) -> Schedule:
+        """The schedule of every model for a down payment (TZS) and a term (days).
+
+        A down payment is never less than the model's catalog kianzio, and a
+        missing one keeps it; a missing term keeps each model's own term, as
+        implied by its catalog payments. The rest of the price is spread evenly
+        over the term, a day's payment rounded up to 100 TZS.
+        """
+        bei, catalog_kianzio, catalog_siku = self.columns["bei"], self.columns["kianzio"], self.columns["siku"]
+        if down_payment is None and days is None:
+            return Schedule(catalog_kianzio, catalog_siku, self.columns["wiki"], self.columns["mwezi"])
+        kianzio = catalog_kianzio if down_payment is None else np.maximum(catalog_kianzio, np.minimum(bei, down_payment))
+        if days is None:
+            terms = np.maximum(1, np.round((bei - catalog_kianzio) / np.maximum(catalog_siku, 1))).astype(np.int64)
+        else:
+            terms = np.int64(max(1, days))
+        siku = -(-(bei - kianzio) // (terms * ROUND_TO)) * ROUND_TO
+        return Schedule(kianzio, siku, siku * DAYS_PER_WEEK, siku * DAYS_PER_MONTH)
+
+
+def _amount(token: Text) -> Optional[int]:
+    if not token[0].isdigit():
+        return None
+    thousands = token.endswith("k")
+    number = token.rstrip("k")
+    # "100,000" and "100.000" group thousands; "1.5k" is a decimal
+    if thousands and number.count(".") == 1 and "," not in number:
+        value = float(number)
+    else:
+        value = float(number.replace(",", "").replace(".", ""))
+    return int(value * 1000 if thousands else value)
+
+
+def _field(word: Text) -> Optional[Text]:
+    return _WORD_FIELDS.get(word)
+
+
+def mentions_amount(text: Text) -> bool:
+    """Whether `text` names a sum of money, which makes it a budget question."""
+    tokens = _BUDGET_TOKEN.findall(text.lower())
+    return "elfu" in tokens or any((_amount(token) or 0) >= MIN_AMOUNT for token in tokens)
+
+
+def parse_budget(text: Text, catalog: PhoneCatalog) -> Budget:
+    """Reads the limits, term and brand out of a budget question.
+
+    Each amount limits the field named nearest to it within its clause, or
+    the cash price when none is named: "kianzio 100,000 na 15,000 kwa wiki"
+    is {"kianzio": 100000, "wiki": 15000}. "elfu 15" is 15,000.
+    """
+    tokens = _BUDGET_TOKEN.findall(text.lower())
+    limits: Dict[Text, int] = {}
+    days = None
+    clause = 0
+    clauses, amounts = [], []
+    for position, token in enumerate(tokens):
+        if token in CLAUSE_BREAKS:
+            clause += 1
+        clauses.append(clause)
+        value = _amount(token)
+        if value is not None and position > 0 and tokens[position - 1] in ("elfu", "thousand"):
+            value *= 1000
+        if value is not None and position + 1 < len(tokens) and tokens[position + 1] == "thousand":
+            value *= 1000
+        amounts.append(value)
+
+    for position, value in enumerate(amounts):
+        if value is None:
+            continue
+        if value < MIN_AMOUNT:
+            neighbours = tokens[position + 1:position + 2] + tokens[max(0, position - 1):position]
+            unit = next((TERM_DAYS[word] for word in neighbours if word in TERM_DAYS), None)
+            if unit is not None:
+                days = value * unit
+            continue
+        # Nearest named field in the same clause; a word before the amount wins a tie
+        named = [(abs(other - position), other > position, _field(word))
+                 for other, word in enumerate(tokens)
+                 if clauses[other] == clauses[position] and amounts[other] is None and _field(word)]
+        field = min(named)[2] if named else "bei"
+        limits[field] = min(value, limits.get(field, value))
+    return Budget(limits, catalog.match(text).brand, days)
+
+
+class AffordabilityIndexCache:
+    """The index of the current catalog version, rebuilt when the catalog changes."""
+
+    def __init__(self) -> None:
+        self._index: Optional[AffordabilityIndex] = None
+        self._lock = threading.Lock()
+
+    def warm(self, catalog: PhoneCatalog) -> None:
+        """Builds the index for `catalog` unless already done."""
+        self.get(catalog)
+
+    def get(self, catalog: PhoneCatalog) -> AffordabilityIndex:
+        index = self._index
+        if index is not None and index.version == catalog.version:
+            return index
+        with self._lock:
+            if self._index is None or self._index.version != catalog.version:
+                self._index = AffordabilityIndex(catalog)
+            return self._index
+
+
+AFFORDABILITY = AffordabilityIndexCache()
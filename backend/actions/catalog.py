@@ -0,0 +1,326 @@
+"""Phone price catalog shared by the price and lock actions.
+
+Prices and lock solutions are read from `sales_data.json` (or a directory of
+JSON/CSV files) and indexed once per load. Every alias of every model, every
+brand and every lock solution name is compiled into a single Aho-Corasick
+automaton, so a user message is resolved to its model, brand and lock type in
+one pass over the normalized text. `CatalogStore`
+watches the source files and swaps in a freshly built catalog when they change.
+"""
+import csv
+import hashlib
+import json
+import logging
+import os
+import re
+import threading
+from collections import deque
+from pathlib import Path
+from typing import Any, Callable, Dict, Iterable, Iterator, List, NamedTuple, Optional, Text, Tuple
+
+from .locks import LockRegistry, LockSolution, lock_solutions_from_json
+
+logger = logging.getLogger(__name__)
+
+# A catalog file caught mid-write fails with one of these.
+_LOAD_ERRORS = (OSError, ValueError, KeyError, TypeError, AttributeError)
+
+PRICE_FIELDS = ["bei", "kianzio", "siku", "wiki", "mwezi"]
+
+_WORD = re.compile(r"[a-z0-9+/-]+")
+# Memory sizes typed with spaces ("4 / 64 GB") are rare; they take the slower
+# tokenizer that keeps them together as one token.
+_SPACED_TOKEN = re.compile(r"\d+\s*(?:gb|g)?\s*/\s*\d+\s*(?:gb|g)?(?![a-z0-9])|\d+\s+gb\b|[a-z0-9+/-]+")
+
+
+def _canonical_size(token: Text) -> Text:
+    first, _, second = token.replace(" ", "").partition("/")
+    first, second = first.rstrip("gb"), second.rstrip("gb")
+    if not second:
+        return first + "gb"
+    if not (first.isdigit() and second.isdigit()):
+        return token
+    ram, storage = sorted((int(first), int(second)))
+    return f"{ram}/{storage}gb"
+
+
+def tokenize(text: Text) -> List[Text]:
+    """Splits text into lowercase word tokens with memory sizes in one canonical form.
+
+    "4G/64GB", "4 / 64 gb" and "64GB/4GB" all become the token "4/64gb".
+    """
+    text = text.lower()
+    if "gb" not in text and "/" not in text:
+        return _WORD.findall(text)
+    spaced = " /" in text or "/ " in text or " gb" in text
+    tokens = (_SPACED_TOKEN if spaced else _WORD).findall(text)
+    for index, token in enumerate(tokens):
+        if token[0].isdigit() and ("/" in token or token.endswith("gb")):
+            tokens[index] = _canonical_size(token)
+    return tokens
+
+
+class PhoneInfo(NamedTuple):
+    brand: Text
+    lock_solution: Text
+    bei: int
+    kianzio: int
+    siku: int
+    wiki: int
+    mwezi: int
+
+
+class CatalogMatch(NamedTuple):
+    model: Optional[Text]
+    brand: Optional[Text]
+    lock_type: Optional[Text] = None
+
+
+class PatternMatcher:
+    """Aho-Corasick automaton over word tokens.
+
+    Patterns and text are split with the same tokenizer, so a pattern only ever
+    matches whole words and the scan costs one step per word of the message.
+    """
+
+    def __init__(self, patterns: Dict[Text, Any]) -> None:
+        self._goto: List[Dict[Text, int]] = [{}]
+        self._fail: List[int] = [0]
+        self._output: List[List[Tuple[int, Any]]] = [[]]
+
+        for pattern, value in patterns.items():
+            tokens = tokenize(pattern)
+            state = 0
+            for token in tokens:
+                next_state = self._goto[state].get(token)
+                if next_state is None:
+                    next_state = len(self._goto)
+                    self._goto[state][token] = next_state
+                    self._goto.append({})
+                    self._fail.append(0)
+                    self._output.append([])
+                state = next_state
+            self._output[state].append((len(tokens), value))
+
+        queue = deque(self._goto[0].values())
+        while queue:
+            state = queue.popleft()
+            for token, next_state in self._goto[state].items():
+                queue.append(next_state)
+                fallback = self._fail[state]
+                while fallback and token not in self._goto[fallback]:
+                    fallback = self._fail[fallback]
+                self._fail[next_state] = self._goto[fallback].get(token, 0)
+                self._output[next_state].extend(self._output[self._fail[next_state]])
+
+    def find_all(self, tokens: List[Text]) -> Iterator[Tuple[int, int, Any]]:
+        """Yields (start, end, value) token spans for every pattern in `tokens`."""
+        goto, fail, output = self._goto, self._fail, self._output
+        state = 0
+        for index, token in enumerate(tokens):
+            while state and token not in goto[state]:
+                state = fail[state]
+            state = goto[state].get(token, 0)
+            for length, value in output[state]:
+                yield index + 1 - length, index + 1, value
+
+
+class PhoneCatalog:
+    """Indexed view over the phone pricing table."""
+
+    def __init__(self, pricing: Dict[Text, Dict[Text, Any]], lock_solutions: Iterable[LockSolution] = (), version: Text = "") -> None:
+        self.version = version
+        self.phones: Dict[Text, PhoneInfo] = {
+            model: PhoneInfo(**{field: info[field] for field in PhoneInfo._fields})
+            for model, info in pricing.items()
+        }
+        self.locks = LockRegistry(lock_solutions, {info.brand: info.lock_solution for info in self.phones.values()})
+        self.brands: List[Text] = list(dict.fromkeys(
+            [info.brand for info in self.phones.values()] + list(self.locks.brands)
+        ))
+        self._brand_models: Dict[Text, List[Text]] = {brand: [] for brand in self.brands}
+        for model, info in self.phones.items():
+            self._brand_models[info.brand].append(model)
+
+        self.aliases = self._build_aliases()
+        patterns: Dict[Text, Tuple[Text, Text]] = {name: ("lock", name) for name in self.locks.solutions}
+        patterns.update({brand: ("brand", brand) for brand in self.brands})
+        patterns.update({alias: ("model", model) for alias, model in self.aliases.items()})
+        self._matcher = PatternMatcher(patterns)
+
+    def _build_aliases(self) -> Dict[Text, Text]:
+        aliases: Dict[Text, Text] = {}
+        short_aliases: Dict[Text, List[Text]] = {}
+        for model, info in self.phones.items():
+            canonical = " ".join(tokenize(model))
+            without_brand = canonical[len(info.brand):].strip() if canonical.startswith(info.brand + " ") else canonical
+            aliases[canonical] = model
+            aliases[without_brand] = model
+
+            # "a18 64gb" style aliases name the storage only; they are kept
+            # when no other model shares the same series and storage.
+            sizes = re.search(r"(\d+)/(\d+)gb$", without_brand)
+            if sizes:
+                series = without_brand[:sizes.start()].strip()
+                for alias in (f"{series} {sizes.group(2)}gb", f"{info.brand} {series} {sizes.group(2)}gb"):
+                    short_aliases.setdefault(alias, []).append(model)
+
+        for alias, models in short_aliases.items():
+            if len(set(models)) == 1 and alias not in aliases:
+                aliases[alias] = models[0]
+        return aliases
+
+    def get(self, model: Text) -> Optional[PhoneInfo]:
+        return self.phones.get(model)
+
+    def models_for_brand(self, brand: Text) -> List[Text]:
+        return self._brand_models.get(brand, [])
+
+    def match(self, message: Text) -> CatalogMatch:
+        """Finds the longest model alias and the first brand and lock type in `message`."""
+        return self._match(tokenize(message))[0]
+
+    def match_with_confidence(self, message: Text) -> Tuple[CatalogMatch, float]:
+        """Like `match`, plus the share of the message's tokens the model alias covers.
+
+        "OPPO A18 4/64GB" is 1.0, "OPPO A18 4/64GB blue" 0.75; no model is 0.0.
+        """
+        tokens = tokenize(message)
+        match, model_span = self._match(tokens)
+        if model_span is None:
+            return match, 0.0
+        return match, (model_span[1] - model_span[0]) / len(tokens)
+
+    def _match(self, tokens: List[Text]) -> Tuple[CatalogMatch, Optional[Tuple[int, int]]]:
+        model, model_span, brand, lock_type = None, None, None, None
+        for start, end, (kind, value) in self._matcher.find_all(tokens):
+            if kind == "model":
+                if model_span is None or end - start > model_span[1] - model_span[0]:
+                    model, model_span = value, (start, end)
+            elif kind == "brand":
+                brand = brand or value
+            else:
+                lock_type = lock_type or value
+        if model is not None:
+            brand = self.phones[model].brand
+        return CatalogMatch(model, brand, lock_type), model_span
+
+
+def _catalog_files(path: Path) -> List[Path]:
+    if path.is_dir():
+        return sorted(p for p in path.iterdir() if p.suffix.lower() in (".json", ".csv"))
+    return [path]
+
+
+def load_sources(path: Path) -> Tuple[Dict[Text, Dict[Text, Any]], List[LockSolution]]:
+    """Reads the pricing table and lock solutions from a JSON/CSV file or a directory of them.
+
+    JSON files contribute their `phone_pricing` mapping of model to fields and
+    their `lock_solutions` list; CSV files need a `model` column next to the
+    price fields. Later files override earlier ones for the same model.
+    """
+    pricing: Dict[Text, Dict[Text, Any]] = {}
+    lock_solutions: List[LockSolution] = []
+    for file in _catalog_files(path):
+        with open(file, "r", encoding="utf-8", newline="") as f:
+            if file.suffix.lower() == ".csv":
+                rows = {row.pop("model"): row for row in csv.DictReader(f)}
+            else:
+                data = json.load(f)
+                rows = data.get("phone_pricing", {})
+                lock_solutions.extend(lock_solutions_from_json(data))
+        for model, info in rows.items():
+            info = dict(info)
+            for field in PRICE_FIELDS:
+                info[field] = int(info[field])
+            pricing[" ".join(model.lower().split())] = info
+    return pricing, lock_solutions
+
+
+def build_catalog(path: Path) -> PhoneCatalog:
+    pricing, lock_solutions = load_sources(path)
+    content = json.dumps([pricing, lock_solutions], sort_keys=True)
+    version = hashlib.sha1(content.encode("utf-8")).hexdigest()[:12]
+    return PhoneCatalog(pricing, lock_solutions, version=version)
+
+
+class CatalogStore:
+    """Holds the current catalog and rebuilds it when its source files change.
+
+    A new catalog is fully built before it replaces the old one with a single
+    reference assignment, so callers that read `store.catalog` once per request
+    always see one complete catalog.
+    """
+
+    def __init__(self, path: Path, interval: float = 5.0) -> None:
+        self.path = Path(path)
+        self.interval = interval
+        self._signature = self._files_signature()
+        self._failed_signature: Optional[Tuple] = None
+        self.catalog = self._build()
+        self._listeners: List[Callable[[PhoneCatalog], None]] = []
+        self._watcher: Optional[threading.Thread] = None
+        self._stop = threading.Event()
+
+    def _files_signature(self) -> Tuple:
+        try:
+            return tuple((str(f), f.stat().st_mtime_ns, f.stat().st_size) for f in _catalog_files(self.path))
+        except OSError:
+            return ()
+
+    def _build(self) -> PhoneCatalog:
+        try:
+            return build_catalog(self.path)
+        except _LOAD_ERRORS as e:
+            logger.error(f"Could not load phone catalog from {self.path}: {e}")
+            return PhoneCatalog({})
+
+    def reload(self) -> bool:
+        """Rebuilds the catalog if the source files changed. Returns True on swap."""
+        signature = self._files_signature()
+        if signature in (self._signature, self._failed_signature):
+            return False
+        try:
+            catalog = build_catalog(self.path)
+        except _LOAD_ERRORS as e:
+            # Keep serving the old catalog until the files change again.
+            self._failed_signature = signature
+            logger.warning(f"Keeping catalog {self.catalog.version}, reload of {self.path} failed: {e}")
+            return False
+        self._signature = signature
+        if catalog.version != self.catalog.version:
+            self.catalog = catalog
+            logger.info(f"Loaded phone catalog {catalog.version} with {len(catalog.phones)} models")
+            for listener in self._listeners:
+                listener(catalog)
+        return True
+
+    def subscribe(self, listener: Callable[[PhoneCatalog], None]) -> None:
+        """Calls `listener` with the current catalog now and with every reloaded one."""
+        self._listeners.append(listener)
+        listener(self.catalog)
+
+    def start(self) -> None:
+        """Starts polling the source files' mtimes in a daemon thread."""
+        if self._watcher is not None:
+            return
+        self._watcher = threading.Thread(target=self._watch, name="catalog-watcher", daemon=True)
+        self._watcher.start()
+
+    def stop(self) -> None:
+        self._stop.set()
+
+    def _watch(self) -> None:
+        while not self._stop.wait(self.interval):
+            self.reload()
+
+
+def default_catalog_path() -> Path:
+    if os.environ.get("SALES_DATA_PATH"):
+        return Path(os.environ["SALES_DATA_PATH"])
+    backend_dir = Path(__file__).resolve().parents[1]
+    candidates = [backend_dir / "sales_data.json", backend_dir.parent / "sales_data.json"]
+    return next((path for path in candidates if path.exists()), candidates[-1])
+
+
+CATALOG_STORE = CatalogStore(default_catalog_path(), interval=float(os.environ.get("SALES_DATA_POLL_SECONDS", "5")))
@@ -0,0 +1,50 @@
+"""Lock solutions, their steps and the brands they are installed on."""
+from typing import Any, Dict, Iterable, List, NamedTuple, Optional, Text, Tuple
+
+
+class LockSolution(NamedTuple):
+    name: Text
+    used_for: Text
+    brands: Tuple[Text, ...]
+    steps: Tuple[Text, ...]
+    note: Text = ""
+
+    @classmethod
+    def from_dict(cls, data: Dict[Text, Any]) -> "LockSolution":
+        return cls(
+            name=data["name"],
+            used_for=data.get("used_for", ""),
+            brands=tuple(brand.lower() for brand in data.get("brands", [])),
+            steps=tuple(data.get("steps", [])),
+            note=data.get("note", ""),
+        )
+
+
+class LockRegistry:
+    """Maps lock solution names and brands to their lock solution.
+
+    Lookups are dict hits, so dispatch does not grow with the number of brands.
+    """
+
+    def __init__(self, solutions: Iterable[LockSolution], brand_locks: Optional[Dict[Text, Text]] = None) -> None:
+        self.solutions: Dict[Text, LockSolution] = {solution.name.lower(): solution for solution in solutions}
+        self.brands: Dict[Text, LockSolution] = {}
+        for solution in self.solutions.values():
+            for brand in solution.brands:
+                self.brands.setdefault(brand, solution)
+        # Brands that only appear in the price catalog use the lock solution
+        # their phones are listed with.
+        for brand, lock_name in (brand_locks or {}).items():
+            solution = self.solutions.get(lock_name.lower())
+            if solution is not None:
+                self.brands.setdefault(brand, solution)
+
+    def get(self, name: Text) -> Optional[LockSolution]:
+        return self.solutions.get(name.lower())
+
+    def for_brand(self, brand: Text) -> Optional[LockSolution]:
+        return self.brands.get(brand)
+
+
+def lock_solutions_from_json(data: Dict[Text, Any]) -> List[LockSolution]:
+    return [LockSolution.from_dict(item) for item in data.get("lock_solutions", [])]
@@ -0,0 +1,142 @@
+"""Timing and outcome metrics for the custom actions, in Prometheus text format.
+
+Off unless ACTION_METRICS_PORT is set. Then every `@instrument`-ed action
+records its latency, the size of what it sent and the NLU confidence of the
+message it answered, and actions count which kind of match they served
+(model, brand, lock type or fallback). The numbers are served as
+Prometheus text on http://<host>:$ACTION_METRICS_PORT/metrics, next to the
+action server's webhook. When it is off, `instrument` returns the action's
+`run` unchanged and `count_match` returns at once.
+"""
+import functools
+import logging
+import os
+import threading
+import time
+from bisect import bisect_left
+from collections import Counter
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from typing import Any, Callable, Dict, List, Optional, Sequence, Text, Tuple
+
+logger = logging.getLogger(__name__)
+
+LATENCY_BUCKETS = [0.0005, 0.001, 0.0025, 0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1.0]
+SIZE_BUCKETS = [64, 256, 512, 1024, 2048, 4096, 16384]
+CONFIDENCE_BUCKETS = [0.3, 0.5, 0.7, 0.8, 0.9, 0.95, 0.99, 1.0]
+
+
+class Histogram:
+    def __init__(self, buckets: Sequence[float]) -> None:
+        self.buckets = list(buckets)
+        self.counts = [0] * (len(self.buckets) + 1)
+        self.sum = 0.0
+        self.count = 0
+
+    def observe(self, value: float) -> None:
+        self.counts[bisect_left(self.buckets, value)] += 1
+        self.sum += value
+        self.count += 1
+
+    def lines(self, name: Text, labels: Text) -> List[Text]:
+        lines, cumulative = [], 0
+        for bound, count in zip(self.buckets + ["+Inf"], self.counts):
+            cumulative += count
+            lines.append(f'{name}_bucket{{{labels},le="{bound}"}} {cumulative}')
+        lines.append(f"{name}_sum{{{labels}}} {self.sum}")
+        lines.append(f"{name}_count{{{labels}}} {self.count}")
+        return lines
+
+
+class ActionMetrics:
+    def __init__(self, enabled: bool) -> None:
+        self.enabled = enabled
+        self._latency: Dict[Text, Histogram] = {}
+        self._size: Dict[Text, Histogram] = {}
+        self._confidence: Dict[Text, Histogram] = {}
+        self._matches: Counter = Counter()
+        self._lock = threading.Lock()
+
+    def observe(self, action: Text, seconds: float, size: int, confidence: Optional[float]) -> None:
+        with self._lock:
+            self._latency.setdefault(action, Histogram(LATENCY_BUCKETS)).observe(seconds)
+            self._size.setdefault(action, Histogram(SIZE_BUCKETS)).observe(size)
+            if confidence is not None:
+                self._confidence.setdefault(action, Histogram(CONFIDENCE_BUCKETS)).observe(confidence)
+
+    def count_match(self, action: Text, match: Text) -> None:
+        """Counts what an action answered with: "model", "brand", "lock_type", "fallback", ..."""
+        if not self.enabled:
+            return
+        with self._lock:
+            self._matches[action, match] += 1
+
+    def render(self) -> Text:
+        families: List[Tuple[Text, Text, Text, Dict[Text, Histogram]]] = [
+            ("action_latency_seconds", "histogram", "Time spent in Action.run.", self._latency),
+            ("action_response_bytes", "histogram", "UTF-8 size of the text an action sent.", self._size),
+            ("action_nlu_confidence", "histogram", "Intent confidence of the message an action answered.", self._confidence),
+        ]
+        lines = []
+        with self._lock:
+            for name, kind, help_text, histograms in families:
+                lines += [f"# HELP {name} {help_text}", f"# TYPE {name} {kind}"]
+                for action, histogram in sorted(histograms.items()):
+                    lines += histogram.lines(name, f'action="{action}"')
+            lines += ["# HELP action_matches_total What each action answered with.",
+                      "# TYPE action_matches_total counter"]
+            for (action, match), count in sorted(self._matches.items()):
+                lines.append(f'action_matches_total{{action="{action}",match="{match}"}} {count}')
+        return "\n".join(lines) + "\n"
+
+    def serve(self, port: int) -> None:
+        """Serves /metrics from a daemon thread."""
+        metrics = self
+
+        class Handler(BaseHTTPRequestHandler):
+            def do_GET(self) -> None:
+                if self.path != "/metrics":
+                    self.send_error(404)
+                    return
+                body = metrics.render().encode("utf-8")
+                self.send_response(200)
+                self.send_header("Content-Type", "text/plain; version=0.0.4; charset=utf-8")
+                self.send_header("Content-Length", str(len(body)))
+                self.end_headers()
+                self.wfile.write(body)
+
+            def log_message(self, format: Text, *args: Any) -> None:
+                pass
+
+        try:
+            server = ThreadingHTTPServer(("0.0.0.0", port), Handler)
+        except OSError as e:
+            logger.warning("Action metrics not served on port %s: %s", port, e)
+            return
+        threading.Thread(target=server.serve_forever, name="action-metrics", daemon=True).start()
+        logger.info("Action metrics on http://0.0.0.0:%s/metrics", port)
+
+
+def instrument(run: Callable) -> Callable:
+    """Records latency, response size and NLU confidence of an Action.run."""
+    if not METRICS.enabled:
+        return run
+
+    @functools.wraps(run)
+    def timed_run(self: Any, dispatcher: Any, tracker: Any, domain: Dict[Text, Any]) -> Any:
+        sent = len(dispatcher.messages)
+        started = time.perf_counter()
+        try:
+            return run(self, dispatcher, tracker, domain)
+        finally:
+            seconds = time.perf_counter() - started
+            size = sum(len((message.get("text") or "").encode("utf-8")) for message in dispatcher.messages[sent:])
+            confidence = (tracker.latest_message.get("intent") or {}).get("confidence")
+            METRICS.observe(self.name(), seconds, size, confidence)
+
+    return timed_run
+
+
+_PORT = os.environ.get("ACTION_METRICS_PORT", "")
+METRICS = ActionMetrics(enabled=bool(_PORT))
+if _PORT:
+    METRICS.serve(int(_PORT))
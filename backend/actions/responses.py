@@ -0,0 +1,202 @@
+"""Pre-rendered answers for the price and lock actions.
+
+Answers are a pure function of the catalog, so every model, brand and lock
+answer is rendered once per catalog version. Anything not rendered up front
+goes through a small LRU keyed by the same version, such as the budget
+answers, which depend on the amounts in the message.
+"""
+import threading
+from collections import OrderedDict
+from typing import Any, Callable, Dict, Hashable, List, NamedTuple, Optional, Text
+
+from .affordability import AffordabilityIndex, Budget, Schedule
+from .catalog import PhoneCatalog
+from .locks import LockSolution
+
+HELP_FOOTER = "Unahitaji msaada zaidi, nipo kukusaidia."
+
+PRICE_FALLBACK = ("Samahani, sijaona modeli au brand uliyotaja. Tafadhali taja modeli, k.m. 'OPPO A18 4/64GB', au brand, k.m. 'OPPO', au uliza 'Bei za simu' kwa orodha yote. "
+                  "Unahitaji msaada zaidi, nipo kukusaidia.")
+
+LOCK_FALLBACK = ("Samahani, sijaona brand au lock type uliyotaja. Taja brand (k.m., Realme) au lock type (k.m., Think Adams) kwa maelezo ya hatua za kulock, au uliza 'lock solutions zote' kwa maelezo yote. "
+                 "Unahitaji msaada zaidi, nipo kukusaidia.")
+
+AFFORDABILITY_FALLBACK = ("Samahani, sijaona kiasi cha bajeti ya mteja. Taja kiasi, k.m. 'Simu gani kwa kianzio cha 100,000 na 15,000 kwa wiki?' "
+                          "au 'Tecno chini ya 400,000'. Unahitaji msaada zaidi, nipo kukusaidia.")
+
+NOTHING_AFFORDABLE = ("Samahani, hakuna simu inayoendana na bajeti hiyo. Jaribu kiasi kikubwa zaidi au uliza 'Bei za simu' kwa orodha yote. "
+                      "Unahitaji msaada zaidi, nipo kukusaidia.")
+
+FIELD_LABELS = {"bei": "Bei ya Kuuzia", "kianzio": "Kianzio", "siku": "Malipo ya Siku",
+                "wiki": "Malipo ya Wiki", "mwezi": "Malipo ya Mwezi"}
+
+def render_model(catalog: PhoneCatalog, model: Text) -> Text:
+    pricing = catalog.get(model)
+    return (f"Bei ya {model.upper()} (Lock Solution: {pricing.lock_solution}):\n"
+            f"- Bei ya Kuuzia: TZS {pricing.bei:,}\n"
+            f"- Kianzio: TZS {pricing.kianzio:,}\n"
+            f"- Malipo ya Siku: TZS {pricing.siku:,}\n"
+            f"- Malipo ya Wiki: TZS {pricing.wiki:,}\n"
+            f"- Malipo ya Mwezi: TZS {pricing.mwezi:,}\n"
+            f"{HELP_FOOTER}")
+
+
+def render_brand(catalog: PhoneCatalog, brand: Text) -> Optional[Text]:
+    models = catalog.models_for_brand(brand)
+    if not models:
+        return None
+    parts = [f"Bei za simu za {brand.upper()} (Lock Solution: {catalog.get(models[0]).lock_solution}):\n\n"]
+    for model in models:
+        pricing = catalog.get(model)
+        parts.append(f"{model.upper()}:\n"
+                     f"- Bei ya Kuuzia: TZS {pricing.bei:,}\n"
+                     f"- Kianzio: TZS {pricing.kianzio:,}\n"
+                     f"- Malipo ya Siku: TZS {pricing.siku:,}\n"
+                     f"- Malipo ya Wiki: TZS {pricing.wiki:,}\n"
+                     f"- Malipo ya Mwezi: TZS {pricing.mwezi:,}\n\n")
+    parts.append(HELP_FOOTER)
+    return "".join(parts)
+
+
+def render_price_list(catalog: PhoneCatalog) -> Text:
+    parts = ["Hizi ni bei za simu za OnfonMobile TZ (TZS):\n\n"]
+    for number, (model, pricing) in enumerate(catalog.phones.items(), start=1):
+        parts.append(f"{number}. Simu: {model.upper()} ({pricing.lock_solution})\n"
+                     f"   Bei ya Kuuzia: {pricing.bei:,}\n"
+                     f"   Kianzio: {pricing.kianzio:,}\n"
+                     f"   Malipo ya Siku: {pricing.siku:,}\n"
+                     f"   Malipo ya Wiki: {pricing.wiki:,}\n"
+                     f"   Malipo ya Mwezi: {pricing.mwezi:,}\n")
+    parts.append(HELP_FOOTER)
+    return "".join(parts)
+
+
+def render_affordable(index: AffordabilityIndex, budget: Budget, brand: Optional[Text], models: List[Text], schedule: Schedule) -> Text:
+    if not models:
+        return NOTHING_AFFORDABLE
+    limits = ", ".join(f"{FIELD_LABELS[field]} hadi TZS {value:,}" for field, value in budget.limits.items())
+    brand_name = f" za {brand.upper()}" if brand else ""
+    parts = [f"Simu{brand_name} zinazoendana na bajeti ({limits}):\n" if limits else f"Simu{brand_name}:\n"]
+    if budget.days:
+        parts.append(f"Malipo yamehesabiwa kwa muda wa siku {budget.days}.\n")
+    parts.append("\n")
+    bei = index.columns["bei"]
+    for number, model in enumerate(models, start=1):
+        row = index.rows[model]
+        parts.append(f"{number}. {model.upper()}:\n"
+                     f"- Bei ya Kuuzia: TZS {bei[row]:,}\n"
+                     f"- Kianzio: TZS {schedule.kianzio[row]:,}\n"
+                     f"- Malipo ya Siku: TZS {schedule.siku[row]:,}\n"
+                     f"- Malipo ya Wiki: TZS {schedule.wiki[row]:,}\n"
+                     f"- Malipo ya Mwezi: TZS {schedule.mwezi[row]:,}\n\n")
+    parts.append(HELP_FOOTER)
+    return "".join(parts)
+
+
+def _lock_steps(solution: LockSolution) -> Text:
+    lines = [f"{chr(ord('a') + number)}) {step}\n" for number, step in enumerate(solution.steps)]
+    if solution.note:
+        lines.append(f"{solution.note}\n")
+    return "".join(lines)
+
+
+def render_lock_type(solution: LockSolution) -> Text:
+    return (f"Lock Solution ya {solution.name} inatumika kwa simu za {solution.used_for}. Hatua za kulock:\n"
+            f"{_lock_steps(solution)}"
+            f"{HELP_FOOTER}")
+
+
+def render_lock_brand(brand: Text, solution: LockSolution) -> Text:
+    return (f"Ili kulock simu ya {brand.capitalize()} (inatumia {solution.name}):\n"
+            f"{_lock_steps(solution)}"
+            f"{HELP_FOOTER}")
+
+
+class Generation(NamedTuple):
+    """The answers of one catalog version: pre-rendered ones and an LRU for the rest."""
+    rendered: Dict[Hashable, Text]
+    lru: "OrderedDict[Hashable, Text]"
+
+
+class ResponseCache:
+    """Rendered answers per catalog version.
+
+    The last `versions` generations are kept, keyed by catalog version, so a
+    request still holding the previous catalog gets that catalog's answers
+    without re-rendering or evicting the new one. The mapping is replaced,
+    never changed in place, so readers need no lock to find their generation.
+    """
+
+    def __init__(self, maxsize: int = 256, versions: int = 2) -> None:
+        self.maxsize = maxsize
+        self.versions = versions
+        self.hits = 0
+        self.misses = 0
+        self._generations: "OrderedDict[Text, Generation]" = OrderedDict()
+        self._lock = threading.Lock()
+
+    def _prerender(self, catalog: PhoneCatalog) -> Dict[Hashable, Text]:
+        rendered: Dict[Hashable, Text] = {("price_list",): render_price_list(catalog)}
+        for model in catalog.phones:
+            rendered[("model", model)] = render_model(catalog, model)
+        for brand in catalog.brands:
+            text = render_brand(catalog, brand)
+            if text:
+                rendered[("brand", brand)] = text
+        for name, solution in catalog.locks.solutions.items():
+            rendered[("lock_type", name)] = render_lock_type(solution)
+        for brand, solution in catalog.locks.brands.items():
+            rendered[("lock_brand", brand)] = render_lock_brand(brand, solution)
+        return rendered
+
+    def _generation(self, catalog: PhoneCatalog) -> Generation:
+        generation = self._generations.get(catalog.version)
+        if generation is not None:
+            return generation
+        with self._lock:
+            generation = self._generations.get(catalog.version)
+            if generation is None:
+                generation = Generation(self._prerender(catalog), OrderedDict())
+                generations = OrderedDict(self._generations)
+                generations[catalog.version] = generation
+                while len(generations) > self.versions:
+                    generations.popitem(last=False)
+                self._generations = generations
+            return generation
+
+    def warm(self, catalog: PhoneCatalog) -> None:
+        """Renders every known answer for `catalog` unless already done."""
+        self._generation(catalog)
+
+    def get(self, catalog: PhoneCatalog, key: Hashable, render: Optional[Callable[[], Optional[Text]]] = None) -> Optional[Text]:
+        """Returns the answer for `key` in `catalog`, rendering and remembering it on a miss."""
+        generation = self._generation(catalog)
+        text = generation.rendered.get(key)
+        with self._lock:
+            if text is None:
+                text = generation.lru.get(key)
+                if text is not None:
+                    generation.lru.move_to_end(key)
+            if text is not None:
+                self.hits += 1
+            else:
+                self.misses += 1
+        if text is not None or render is None:
+            return text
+
+        text = render()
+        if text is not None:
+            with self._lock:
+                generation.lru[key] = text
+                if len(generation.lru) > self.maxsize:
+                    generation.lru.popitem(last=False)
+        return text
+
+    def stats(self) -> Dict[Text, Any]:
+        generations = self._generations
+        version, generation = next(reversed(generations.items()), (None, Generation({}, OrderedDict())))
+        return {"version": version, "versions": len(generations), "prerendered": len(generation.rendered),
+                "lru": len(generation.lru), "hits": self.hits, "misses": self.misses}
+
+
+RESPONSE_CACHE = ResponseCache()
@@ -1,7 +1,56 @@
+import argparse
+import heapq
 import yaml
 import random
+import re
 from pathlib import Path
 
+# Hand-written examples live outside data/, which Rasa trains on; the
+# augmented examples are written to data/nlu.yml. Augmenting data/nlu.yml
+# itself would stack templates on earlier variations.
+NLU_SOURCE = "nlu.base.yml"
+NLU_PATH = "data/nlu.yml"
+# extract.py writes the examples it finds in the sales PDFs here; they are
+# merged into the hand-written ones, never written over them
+NLU_EXTRACTED = "extracted/nlu.yml"
+
+# Whole-word markers of Swahili examples; matched per token so that e.g.
+# "Maintenance" no longer counts as Swahili because it contains "ni".
+SWAHILI_TOKENS = frozenset([
+    "ni", "ya", "za", "wa", "kwa", "jinsi", "nawezaje", "nini", "gani", "je", "simu", "nifanye", "hatua",
+])
+
+EN_TEMPLATES = [
+    "What is {}?", "Tell me about {}.", "How does {} work?", "Explain {} in detail.",
+    "Can you help with {}?", "What’s the process for {}?", "How to {}?",
+    "Give me details on {}.", "What are the steps for {}?", "I need info on {}.",
+    "How do I handle {}?", "What’s {} all about?", "Show me how to {}.",
+    "Can you explain {}?", "What do I do for {}?"
+]
+
+SW_TEMPLATES = [
+    "{} ni nini?", "Nawezaje {}?", "Jinsi ya {}?", "Elezea {} kwa undani.",
+    "Unaweza kunisaidia na {}?", "Mchakato wa {} ni upi?", "Nifanye nini kwa {}?",
+    "Toa maelezo ya {}.", "Hatua za {} ni zipi?", "Nihitaji taarifa za {}.",
+    "Jinsi ya kushughulikia {}?", "{} inahusu nini?", "Nionyeshe jinsi ya {}.",
+    "Unaweza kuelezea {}?", "Nifanye nini ili {}?"
+]
+
+INTENT_TEMPLATES = {
+    "ask_sales_process": {
+        "en": ["How to register a {} customer?", "What’s the {} sales process?"],
+        "sw": ["Jinsi ya kusajili mteja wa {}?", "Mchakato wa mauzo ya {} ni upi?"],
+    },
+    "ask_payment_methods": {
+        "en": ["Can I pay {} with M-Pesa?", "What’s the payment method for {}?"],
+        "sw": ["Ninaweza kulipa {} kwa M-Pesa?", "Njia ya malipo ya {} ni ipi?"],
+    },
+    "phone_pricing": {
+        "en": ["How much is the {}?", "What’s the price of {}?"],
+        "sw": ["Bei ya {} ni kiasi gani?", "Kianzio cha {} ni kiasi gani?"],
+    },
+}
+
 def load_nlu(file_path):
     with open(file_path, "r", encoding="utf-8") as f:
         return yaml.safe_load(f)
@@ -11,86 +60,181 @@ def save_nlu(data, file_path):
         yaml.dump(data, f, allow_unicode=True, sort_keys=False)
     print(f"Saved {file_path}")
 
+def intent_examples(intent_data):
+    examples = intent_data["examples"].split("\n- ")
+    examples = [ex.strip().removeprefix("- ").strip() for ex in examples]
+    return [ex for ex in examples if ex]
+
+def merge_nlu(nlu_data, extracted_data):
+    """Adds the extracted examples to the intents of the hand-written data.
+
+    Intents the hand-written data does not have are left out, since the
+    domain would not know them either.
+    """
+    extracted = {item["intent"]: intent_examples(item) for item in extracted_data.get("nlu", [])}
+    merged = {"version": nlu_data.get("version", "3.1"), "nlu": []}
+    for intent_data in nlu_data["nlu"]:
+        examples = intent_examples(intent_data) + extracted.get(intent_data["intent"], [])
+        merged["nlu"].append({**intent_data, "examples": "- " + "\n- ".join(dict.fromkeys(examples))})
+    return merged
+
+def is_swahili(example):
+    return any(token in SWAHILI_TOKENS for token in re.findall(r"\w+", example.lower()))
+
+def variation_templates(intent, lang="en"):
+    base_templates = EN_TEMPLATES if lang == "en" else SW_TEMPLATES
+    return base_templates + INTENT_TEMPLATES.get(intent, {}).get(lang, [])
+
 def generate_variations(base_example, intent, lang="en"):
-    if lang == "en":
-        templates = [
-            "What is {}?", "Tell me about {}.", "How does {} work?", "Explain {} in detail.",
-            "Can you help with {}?", "What’s the process for {}?", "How to {}?",
-            "Give me details on {}.", "What are the steps for {}?", "I need info on {}.",
-            "How do I handle {}?", "What’s {} all about?", "Show me how to {}.",
-            "Can you explain {}?", "What do I do for {}?"
-        ]
-    else:  # sw
-        templates = [
-            "{} ni nini?", "Nawezaje {}?", "Jinsi ya {}?", "Elezea {} kwa undani.",
-            "Unaweza kunisaidia na {}?", "Mchakato wa {} ni upi?", "Nifanye nini kwa {}?",
-            "Toa maelezo ya {}.", "Hatua za {} ni zipi?", "Nihitaji taarifa za {}.",
-            "Jinsi ya kushughulikia {}?", "{} inahusu nini?", "Nionyeshe jinsi ya {}.",
-            "Unaweza kuelezea {}?", "Nifanye nini ili {}?"
-        ]
-    
-    variations = [template.format(base_example if lang == "en" else base_example.lower()) for template in templates]
-    
-    if intent == "ask_sales_process":
-        variations.extend([
-            f"How to register a {base_example} customer?" if lang == "en" else f"Jinsi ya kusajili mteja wa {base_example.lower()}?",
-            f"What’s the {base_example} sales process?" if lang == "en" else f"Mchakato wa mauzo ya {base_example.lower()} ni upi?"
-        ])
-    elif intent == "ask_payment_methods":
-        variations.extend([
-            f"Can I pay {base_example} with M-Pesa?" if lang == "en" else f"Ninaweza kulipa {base_example.lower()} kwa M-Pesa?",
-            f"What’s the payment method for {base_example}?" if lang == "en" else f"Njia ya malipo ya {base_example.lower()} ni ipi?"
-        ])
-    elif intent == "phone_pricing":
-        variations.extend([
-            f"How much is the {base_example}?" if lang == "en" else f"Bei ya {base_example.lower()} ni kiasi gani?",
-            f"What’s the price of {base_example}?" if lang == "en" else f"Kianzio cha {base_example.lower()} ni kiasi gani?"
-        ])
-    
-    return variations
-
-def augment_nlu(nlu_data, target_count=1000):
+    base = base_example if lang == "en" else base_example.lower()
+    return [template.format(base) for template in variation_templates(intent, lang)]
+
+def _shuffled_indices(n, rng):
+    """Yields range(n) in random order, one index at a time.
+
+    A lazy Fisher-Yates shuffle: only the swapped positions are stored, so
+    drawing k indices costs O(k) whatever the size of the range.
+    """
+    swapped = {}
+    for i in range(n):
+        j = rng.randrange(i, n)
+        yield swapped.get(j, j)
+        swapped[j] = swapped.get(i, i)
+
+def variation_space(examples, intent):
+    """Returns (size, decode) for every (base example, template) pair of an intent."""
+    spaces = []
+    for lang in ("en", "sw"):
+        bases = [ex if lang == "en" else ex.lower() for ex in examples if is_swahili(ex) == (lang == "sw")]
+        templates = variation_templates(intent, lang)
+        if bases:
+            spaces.append((bases, templates))
+
+    size = sum(len(bases) * len(templates) for bases, templates in spaces)
+
+    def decode(index):
+        for bases, templates in spaces:
+            block = len(bases) * len(templates)
+            if index < block:
+                base, template = divmod(index, len(templates))
+                return templates[template].format(bases[base])
+            index -= block
+        raise IndexError(index)
+
+    return size, decode
+
+def augment_examples(examples, intent, target_count, rng):
+    """Returns up to `target_count` distinct examples: the originals, then sampled variations.
+
+    Variations are drawn without replacement, so this stops as soon as the
+    variation space is exhausted instead of retrying duplicates forever.
+    """
+    new_examples = list(dict.fromkeys(examples))[:target_count]
+    seen = set(new_examples)
+    size, decode = variation_space(new_examples, intent)
+    for index in _shuffled_indices(size, rng):
+        if len(new_examples) >= target_count:
+            break
+        variation = decode(index)
+        if variation not in seen:
+            seen.add(variation)
+            new_examples.append(variation)
+    return new_examples, size
+
+def char_ngrams(example, min_n=1, max_n=4):
+    """The char_wb n-grams CountVectorsFeaturizer sees for an example: per word, padded with spaces."""
+    ngrams = set()
+    for word in example.lower().split():
+        padded = f" {word} "
+        for n in range(min_n, max_n + 1):
+            ngrams.update(padded[i:i + n] for i in range(len(padded) - n + 1))
+    return ngrams
+
+def prune_examples(examples, max_count, protected=0):
+    """Keeps the `max_count` examples that together cover the most distinct char n-grams.
+
+    The first `protected` examples (the hand-written ones) are kept as long as
+    they fit; the rest are picked greedily by how many uncovered n-grams they
+    add. Coverage gains only shrink, so a lazy heap of stale gains is enough.
+    The kept examples stay in their original order.
+    """
+    if len(examples) <= max_count:
+        return list(examples)
+
+    protected = min(protected, max_count)
+    kept = set(range(protected))
+    covered = set()
+    grams = [char_ngrams(example) for example in examples]
+    for index in kept:
+        covered |= grams[index]
+
+    heap = [(-len(grams[i] - covered), i) for i in range(protected, len(examples))]
+    heapq.heapify(heap)
+    while heap and len(kept) < max_count:
+        _, index = heapq.heappop(heap)
+        gain = len(grams[index] - covered)
+        if heap and gain < -heap[0][0]:
+            heapq.heappush(heap, (-gain, index))
+            continue
+        kept.add(index)
+        covered |= grams[index]
+
+    return [examples[i] for i in sorted(kept)]
+
+def augment_nlu(nlu_data, target_count=1000, seed=42, max_per_intent=None):
     augmented_nlu = {"version": "3.1", "nlu": []}
-    
+    removed = 0
+
     for intent_data in nlu_data["nlu"]:
         intent = intent_data["intent"]
-        examples = intent_data["examples"].split("\n- ")[1:]  # Skip first empty
-        examples = [ex.strip() for ex in examples if ex.strip()]
-        
-        en_examples = [ex for ex in examples if not any(w in ex.lower() for w in ["ni", "ya", "jinsi", "nawezaje"])]
-        sw_examples = [ex for ex in examples if any(w in ex.lower() for w in ["ni", "ya", "jinsi", "nawezaje"])]
-        
-        new_examples = set(examples)
-        for ex in en_examples[:10]:  # Limit to avoid performance issues
-            new_examples.update(generate_variations(ex, intent, "en"))
-        for ex in sw_examples[:10]:
-            new_examples.update(generate_variations(ex, intent, "sw"))
-        
-        # Fill to target_count efficiently
-        while len(new_examples) < target_count and (en_examples or sw_examples):
-            base_ex = random.choice(en_examples if random.random() < 0.5 and en_examples else sw_examples)
-            lang = "en" if base_ex in en_examples else "sw"
-            variations = generate_variations(base_ex, intent, lang)
-            new_examples.update(variations[:5])  # Add fewer variations per iteration
-        
-        new_examples = list(new_examples)[:target_count]
-        
+        examples = intent_examples(intent_data)
+
+        # One stream per intent keeps each intent's sample independent of the others
+        rng = random.Random(f"{seed}:{intent}")
+        new_examples, size = augment_examples(examples, intent, target_count, rng)
+        if len(new_examples) < target_count:
+            print(f"{intent}: {len(new_examples)} examples, variation space of {size} exhausted")
+
+        if max_per_intent is not None:
+            before = len(new_examples)
+            new_examples = prune_examples(new_examples, max_per_intent, protected=len(examples))
+            removed += before - len(new_examples)
+
         augmented_nlu["nlu"].append({
             "intent": intent,
             "examples": "- " + "\n- ".join(new_examples)
         })
-    
+
+    if max_per_intent is not None:
+        print(f"Pruned {removed} near-duplicate examples (at most {max_per_intent} per intent)")
     return augmented_nlu
 
+def parse_args():
+    parser = argparse.ArgumentParser(description="Augment the hand-written NLU examples with template variations.")
+    parser.add_argument("--input", default=NLU_SOURCE, help="Hand-written examples.")
+    parser.add_argument("--extracted", default=NLU_EXTRACTED,
+                        help="Examples extracted from the PDFs, merged in when present.")
+    parser.add_argument("--output", default=NLU_PATH, help="Where the augmented training data goes.")
+    parser.add_argument("--target-count", type=int, default=1000, help="Examples per intent.")
+    parser.add_argument("--seed", type=int, default=42)
+    parser.add_argument("--max-per-intent", type=int,
+                        help="Keep only this many maximally distinct examples per intent after augmenting.")
+    return parser.parse_args()
+
 def main():
-    nlu_path = "data/nlu.yml"
-    if not Path(nlu_path).exists():
-        print(f"{nlu_path} not found.")
+    args = parse_args()
+    if not Path(args.input).exists():
+        print(f"{args.input} not found.")
         return
-    
-    nlu_data = load_nlu(nlu_path)
-    augmented_nlu = augment_nlu(nlu_data)
-    save_nlu(augmented_nlu, "data/nlu.yml")
+    if Path(args.input).resolve() == Path(args.output).resolve():
+        print(f"Refusing to augment {args.input} in place; its examples would be augmented again on every run.")
+        return
+
+    nlu_data = load_nlu(args.input)
+    if Path(args.extracted).exists():
+        nlu_data = merge_nlu(nlu_data, load_nlu(args.extracted))
+    augmented_nlu = augment_nlu(nlu_data, args.target_count, args.seed, args.max_per_intent)
+    save_nlu(augmented_nlu, args.output)
 
 if __name__ == "__main__":
-    main()
\ No newline at end of file
+    main()
@@ -0,0 +1,89 @@
+"""Budget search and installment schedules: a scan over the catalog versus the index.
+
+The catalog is scaled up with synthetic SKUs (copies of the real models at
+shifted prices) so that the numbers say how the search grows with the
+catalog, not just how it does on today's few dozen models. Both ways must
+return the same models. Run from the backend directory:
+
+    python benchmarks/bench_affordability.py [--skus 1000 10000 100000]
+"""
+import argparse
+import random
+import sys
+import timeit
+from pathlib import Path
+
+sys.path.insert(0, str(Path(__file__).resolve().parents[1]))
+
+from actions.affordability import ROUND_TO, AffordabilityIndex  # noqa: E402
+from actions.catalog import CATALOG_STORE, PRICE_FIELDS, PhoneCatalog  # noqa: E402
+
+QUERIES = [
+    ({"kianzio": 100000, "wiki": 15000}, None),
+    ({"bei": 400000}, "tecno"),
+    ({"siku": 2000}, None),
+    ({"mwezi": 60000, "kianzio": 120000}, "samsung"),
+    ({"bei": 150000}, None),
+]
+
+
+def scaled_catalog(skus, seed=0):
+    rng = random.Random(seed)
+    base = CATALOG_STORE.catalog
+    pricing = {}
+    for number in range(skus):
+        model, info = rng.choice(list(base.phones.items()))
+        scale = rng.uniform(0.6, 1.8)
+        prices = {field: int(getattr(info, field) * scale) // ROUND_TO * ROUND_TO for field in PRICE_FIELDS}
+        pricing[f"{model} #{number}"] = {**info._asdict(), **prices}
+    return PhoneCatalog(pricing, base.locks.solutions.values(), version=f"scaled-{skus}")
+
+
+def scan_search(catalog, limits, brand, limit=10):
+    """The search as a loop over every model, sorting what fits."""
+    fits = [(info.bei, model) for model, info in catalog.phones.items()
+            if (brand is None or info.brand == brand)
+            and all(getattr(info, field) <= value for field, value in limits.items())]
+    return [model for _, model in sorted(fits, key=lambda fit: fit[0])[:limit]]
+
+
+def scan_installments(catalog, down_payment, days):
+    schedule = []
+    for info in catalog.phones.values():
+        kianzio = max(info.kianzio, min(info.bei, down_payment))
+        siku = -(-(info.bei - kianzio) // (days * ROUND_TO)) * ROUND_TO
+        schedule.append((kianzio, siku, siku * 7, siku * 30))
+    return schedule
+
+
+def per_call(func, number):
+    return min(timeit.repeat(func, number=number, repeat=3)) / number
+
+
+def parse_args():
+    parser = argparse.ArgumentParser(description="Compare a catalog scan with the affordability index.")
+    parser.add_argument("--skus", type=int, nargs="+", default=[36, 1000, 10000, 100000])
+    return parser.parse_args()
+
+
+def main():
+    args = parse_args()
+    print(f"{'skus':>8} {'build ms':>9} {'scan us':>10} {'index us':>10} {'schedule scan ms':>17} {'vectorized ms':>14}")
+    for skus in args.skus:
+        catalog = CATALOG_STORE.catalog if skus == len(CATALOG_STORE.catalog.phones) else scaled_catalog(skus)
+        build = per_call(lambda: AffordabilityIndex(catalog), 1)
+        index = AffordabilityIndex(catalog)
+        for limits, brand in QUERIES:
+            assert index.search(limits, brand) == scan_search(catalog, limits, brand), (limits, brand)
+
+        number = max(1, 20000 // skus)
+        scan = per_call(lambda: [scan_search(catalog, limits, brand) for limits, brand in QUERIES], number) / len(QUERIES)
+        indexed = per_call(lambda: [index.search(limits, brand) for limits, brand in QUERIES], number * 10) / len(QUERIES)
+        schedule_scan = per_call(lambda: scan_installments(catalog, 100000, 180), number)
+        vectorized = per_call(lambda: index.installments(100000, 180), number * 10)
+        print(f"{skus:>8} {build * 1e3:>9.1f} {scan * 1e6:>10.1f} {indexed * 1e6:>10.1f} "
+              f"{schedule_scan * 1e3:>17.2f} {vectorized * 1e3:>14.3f}")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,52 @@
+"""Timing benchmark for augment_nlu.py across target counts.
+
+The old loop spun forever once an intent's template space was used up, so
+only the bounded engine is timed here. Each base example is repeated under a
+numbered suffix to make the variation space big enough for the larger
+targets. Run from the backend directory:
+
+    python benchmarks/bench_augment.py [--targets 100 1000 10000]
+"""
+import argparse
+import contextlib
+import io
+import sys
+import time
+from pathlib import Path
+
+sys.path.insert(0, str(Path(__file__).resolve().parents[1]))
+
+from augment_nlu import NLU_SOURCE, augment_nlu, load_nlu  # noqa: E402
+
+
+def widened(nlu_data, copies):
+    """Returns nlu_data with every example repeated `copies` times under a numbered suffix."""
+    widened_nlu = []
+    for intent_data in nlu_data["nlu"]:
+        examples = [ex.strip().removeprefix("- ").strip() for ex in intent_data["examples"].split("\n- ")]
+        examples = [f"{ex} {n}" for n in range(copies) for ex in examples if ex]
+        widened_nlu.append({"intent": intent_data["intent"], "examples": "- " + "\n- ".join(examples)})
+    return {"version": "3.1", "nlu": widened_nlu}
+
+
+def main():
+    parser = argparse.ArgumentParser()
+    parser.add_argument("--nlu", default=NLU_SOURCE)
+    parser.add_argument("--targets", type=int, nargs="+", default=[100, 1000, 10000])
+    args = parser.parse_args()
+
+    nlu_data = widened(load_nlu(args.nlu), copies=max(args.targets) // 100 + 1)
+    print(f"{'target':>8} {'examples':>10} {'seconds':>9} {'us/example':>11}")
+    for target in args.targets:
+        started = time.perf_counter()
+        with contextlib.redirect_stdout(io.StringIO()):
+            first = augment_nlu(nlu_data, target_count=target)
+            seconds = time.perf_counter() - started
+            again = augment_nlu(nlu_data, target_count=target)
+        total = sum(len(item["examples"].split("\n- ")) for item in first["nlu"])
+        print(f"{target:>8} {total:>10} {seconds:>9.3f} {seconds / total * 1e6:>11.2f}"
+              f"{'' if first == again else '  (not reproducible)'}")
+
+
+if __name__ == "__main__":
+    main()
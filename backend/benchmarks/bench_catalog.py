@@ -0,0 +1,70 @@
+"""Micro-benchmark for price lookups: the old per-call scan versus the shared catalog.
+
+Run from the backend directory:
+
+    python benchmarks/bench_catalog.py
+"""
+import sys
+import timeit
+import tracemalloc
+from pathlib import Path
+
+sys.path.insert(0, str(Path(__file__).resolve().parents[1]))
+
+from actions.catalog import CATALOG_STORE  # noqa: E402
+
+MESSAGES = [
+    "bei ya oppo a18 4/64gb",
+    "Naomba bei ya ZTE A55 4G/128GB tafadhali",
+    "bei za simu za tecno",
+    "hisense e71 64gb/4gb inauzwa bei gani?",
+    "nataka kujua bei ya simu hii",
+]
+
+CATALOG = CATALOG_STORE.catalog
+ROWS = [(model, info._asdict()) for model, info in CATALOG.phones.items()]
+LEGACY_BRANDS = ["oppo", "vivo", "samsung", "infinix", "tecno", "realme", "honor", "hisense", "zte"]
+
+
+def legacy_lookup(message):
+    """The lookup as ActionSendPrice did it before the catalog existed."""
+    user_message = message.lower()
+    # The pricing dict literal was rebuilt on every call.
+    phone_pricing = {model: dict(info) for model, info in ROWS}
+    for model in phone_pricing:
+        if model in user_message:
+            return model, phone_pricing[model]["brand"]
+    user_brand = next((brand for brand in LEGACY_BRANDS if brand in user_message), None)
+    return None, user_brand
+
+
+def catalog_lookup(message):
+    return CATALOG.match(message)
+
+
+def measure(name, func, number=20000):
+    seconds = min(timeit.repeat(lambda: [func(m) for m in MESSAGES], number=number // len(MESSAGES), repeat=3))
+    calls = (number // len(MESSAGES)) * len(MESSAGES)
+
+    tracemalloc.start()
+    for message in MESSAGES * 200:
+        func(message)
+    _, peak = tracemalloc.get_traced_memory()
+    snapshot = tracemalloc.take_snapshot()
+    tracemalloc.stop()
+    allocated = sum(stat.size for stat in snapshot.statistics("filename"))
+
+    print(f"{name:<10} {seconds / calls * 1e6:8.2f} us/call   peak {peak / 1024:8.1f} KiB   retained {allocated / 1024:6.1f} KiB")
+
+
+def main():
+    for message in MESSAGES:
+        legacy, current = legacy_lookup(message), catalog_lookup(message)
+        print(f"{message!r}: before={legacy} after={tuple(current)}")
+    print()
+    measure("before", legacy_lookup)
+    measure("after", catalog_lookup)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,84 @@
+"""Time-to-first-response of a cold Rasa server: `rasa run` versus serve.py.
+
+Each run starts the server as a fresh process and reports when the port
+first accepts a request and when the first message gets a non-empty reply.
+Run from the backend directory (needs rasa installed):
+
+    python benchmarks/bench_cold_start.py [--model models/...tar.gz] [--runs 3]
+"""
+import argparse
+import json
+import statistics
+import subprocess
+import sys
+import time
+import urllib.error
+import urllib.request
+from pathlib import Path
+
+BACKEND_DIR = Path(__file__).resolve().parents[1]
+sys.path.insert(0, str(BACKEND_DIR))
+
+from serve import DEFAULT_MODEL  # noqa: E402
+
+MESSAGE = "/greet"
+
+
+def commands(model, port):
+    return {
+        "before": ["rasa", "run", "-m", model, "--enable-api", "--port", str(port), "--endpoints", "endpoints.yml"],
+        "after": [sys.executable, "serve.py", "--model", model, "--port", str(port), "--endpoints", "endpoints.yml"],
+    }
+
+
+def post_message(port, message):
+    request = urllib.request.Request(
+        f"http://localhost:{port}/webhooks/rest/webhook",
+        data=json.dumps({"sender": "bench", "message": message}).encode("utf-8"),
+        headers={"Content-Type": "application/json"},
+    )
+    with urllib.request.urlopen(request, timeout=30) as response:
+        return json.loads(response.read())
+
+
+def cold_start(command, port, timeout):
+    """Returns (seconds until the port answers, seconds until the first non-empty reply)."""
+    started = time.perf_counter()
+    listening = None
+    server = subprocess.Popen(command, cwd=BACKEND_DIR, stdout=subprocess.DEVNULL, stderr=subprocess.DEVNULL)
+    try:
+        while time.perf_counter() - started < timeout:
+            try:
+                reply = post_message(port, MESSAGE)
+            except (urllib.error.URLError, ConnectionError):
+                time.sleep(0.05)
+                continue
+            if listening is None:
+                listening = time.perf_counter() - started
+            if reply:
+                return listening, time.perf_counter() - started
+            time.sleep(0.05)
+        raise TimeoutError(f"No reply within {timeout}s from {' '.join(command)}")
+    finally:
+        server.terminate()
+        server.wait()
+
+
+def main():
+    parser = argparse.ArgumentParser()
+    parser.add_argument("--model", default=DEFAULT_MODEL)
+    parser.add_argument("--port", type=int, default=5099)
+    parser.add_argument("--runs", type=int, default=3)
+    parser.add_argument("--timeout", type=float, default=300)
+    args = parser.parse_args()
+
+    for name, command in commands(args.model, args.port).items():
+        results = [cold_start(command, args.port, args.timeout) for _ in range(args.runs)]
+        listening = statistics.median(result[0] for result in results)
+        first_reply = statistics.median(result[1] for result in results)
+        print(f"{name:<7} port answers after {listening:6.1f}s, first reply after {first_reply:6.1f}s "
+              f"(median of {args.runs})")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,100 @@
+"""Timing benchmark for the extract.py matchers on a synthetic corpus.
+
+Compares the old per-intent scans (six uncompiled patterns, run once for the
+NLU data and once for the domain) with the single-pass MatchEngine over page
+records. Run from the backend directory:
+
+    python benchmarks/bench_extract_matching.py [--size-mb 10]
+"""
+import argparse
+import random
+import re
+import sys
+import time
+from collections import Counter
+from pathlib import Path
+
+sys.path.insert(0, str(Path(__file__).resolve().parents[1]))
+
+from extract import MATCH_ENGINE, PageRecord  # noqa: E402
+
+LEGACY_PATTERNS = {
+    "ask_sales_process": r"(Sales|Mchakato|Mauzo|Register|Sajili|NIDA|OTP|IMEI|STK|Loan|Customer|Portal).*?([^\n.]+)",
+    "ask_payment_methods": r"(Payment|Malipo|Lipa|M-Pesa|Bank|Cash|Loan|Installment).*?([^\n.]+)",
+    "ask_maintenance": r"(Maintenance|Matengenezo|Warranty|Waranti|Repair|Tengeneza|Service).*?([^\n.]+)",
+    "ask_lost_phone": r"(Lost|Potea|Missing|Simu\s*Iliyopotea|Stolen|Report).*?([^\n.]+)",
+    "lock_phone": r"(Lock|Kulock|V-Trust|Pay\s*Trigger|O-Guard|Trustonic|Think\s*Adams|Vivo|Tecno|Oppo|Samsung|Realme).*?([^\n.]+)",
+    "phone_pricing": r"(\w+\s*\w*)\s*[:,]\s*(\d+[,\d]*\s*TZS|Initial|Weekly|Monthly|Payment|Bei|Kianzio)",
+}
+
+SENTENCES = [
+    "Mchakato wa Mauzo huanza kwa kumsajili mteja kupitia USSD",
+    "Hakikisha NIDA ya mteja ni sahihi kabla ya kuweka IMEI",
+    "Malipo yanaweza kufanyika kwa M-Pesa au Bank",
+    "Matengenezo yote yafanyike ndani ya kipindi cha Warranty",
+    "Simu Iliyopotea iripotiwe polisi mara moja",
+    "Kulock simu ya Vivo tumia V-Trust na kwa Tecno tumia Pay Trigger",
+    "Tecno Camon 30S: 580,000 TZS",
+    "Oppo A18, Kianzio",
+    "Wasiliana na huduma kwa wateja kwa maelezo zaidi",
+    "Bidhaa zote zinauzwa kwa mkopo wa wiki au mwezi",
+]
+
+
+def synthetic_pages(size_mb, page_chars=3000, seed=7):
+    rng = random.Random(seed)
+    pages, total, number = [], 0, 0
+    while total < size_mb * 1024 * 1024:
+        number += 1
+        lines, length = [], 0
+        while length < page_chars:
+            line = ". ".join(rng.choice(SENTENCES) for _ in range(rng.randint(1, 3))) + "."
+            lines.append(line)
+            length += len(line) + 1
+        text = "\n".join(lines)
+        pages.append(PageRecord("synthetic.pdf", number, text))
+        total += len(text)
+    return pages
+
+
+def legacy(text):
+    # generate_nlu_data and generate_domain_data each ran every pattern
+    for _ in range(2):
+        matches = Counter()
+        for intent, pattern in LEGACY_PATTERNS.items():
+            for match in re.finditer(pattern, text, re.IGNORECASE):
+                matches[intent, match.group(2)] += 1
+    return matches
+
+
+def engine(pages):
+    matches = Counter()
+    for record, found in MATCH_ENGINE.scan_records(pages):
+        matches.update((intent, content) for intent, _, content in found)
+    return matches
+
+
+def main():
+    parser = argparse.ArgumentParser()
+    parser.add_argument("--size-mb", type=float, default=10)
+    args = parser.parse_args()
+
+    pages = synthetic_pages(args.size_mb)
+    corpus = "".join(page.text + "\n" for page in pages)
+    print(f"Corpus: {len(corpus) / 1024 / 1024:.1f} MB in {len(pages)} pages")
+
+    started = time.perf_counter()
+    before = legacy(corpus)
+    legacy_seconds = time.perf_counter() - started
+
+    started = time.perf_counter()
+    after = engine(pages)
+    engine_seconds = time.perf_counter() - started
+
+    print(f"before: {legacy_seconds:6.2f}s  12 scans of one string, {sum(before.values())} matches")
+    print(f"after:  {engine_seconds:6.2f}s  1 scan per page, {sum(after.values())} matches")
+    print(f"speed-up: {legacy_seconds / engine_seconds:.1f}x, same matches: {before == after}")
+
+
+if __name__ == "__main__":
+    main()
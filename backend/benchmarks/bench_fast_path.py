@@ -0,0 +1,57 @@
+"""Coverage, accuracy and cost of the REST channel's fast path on nlu.base.yml.
+
+Every labelled example is routed as if a user had sent it. The report shows
+how many examples of each intent skip NLU, how many of those land on a
+different intent than their label, and what routing costs per message.
+Run from the backend directory:
+
+    python benchmarks/bench_fast_path.py
+"""
+import sys
+import timeit
+from collections import Counter
+from pathlib import Path
+
+import yaml
+
+sys.path.insert(0, str(Path(__file__).resolve().parents[1]))
+
+from actions.catalog import CATALOG_STORE  # noqa: E402
+from augment_nlu import NLU_SOURCE  # noqa: E402
+from channels.fast_path import route  # noqa: E402
+
+
+def labelled_examples(path=NLU_SOURCE):
+    with open(path, "r", encoding="utf-8") as f:
+        nlu = yaml.safe_load(f)["nlu"]
+    for item in nlu:
+        for example in item["examples"].splitlines():
+            example = example.strip().removeprefix("- ").strip()
+            if example:
+                yield item["intent"], example
+
+
+def main():
+    catalog = CATALOG_STORE.catalog
+    examples = list(labelled_examples())
+    routed, wrong, totals = Counter(), Counter(), Counter()
+    for intent, text in examples:
+        totals[intent] += 1
+        fast_path = route(text, catalog)
+        if fast_path:
+            routed[intent] += 1
+            if fast_path.intent != intent:
+                wrong[intent] += 1
+                print(f"  {intent}: {text!r} -> {fast_path.message}")
+
+    print(f"\n{'intent':<22} {'examples':>9} {'fast path':>10} {'other intent':>13}")
+    for intent in totals:
+        print(f"{intent:<22} {totals[intent]:>9} {routed[intent]:>10} {wrong[intent]:>13}")
+
+    texts = [text for _, text in examples]
+    seconds = min(timeit.repeat(lambda: [route(text, catalog) for text in texts], number=20, repeat=3))
+    print(f"\nroute(): {seconds / (20 * len(texts)) * 1e6:.1f} us per message")
+
+
+if __name__ == "__main__":
+    main()
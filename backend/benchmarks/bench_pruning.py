@@ -0,0 +1,109 @@
+"""Trains and tests the NLU model with and without near-duplicate pruning.
+
+A seeded share of the hand-written examples in nlu.base.yml is held out as
+the test set; the rest is augmented as augment_nlu.py does, once in full and
+once pruned to --max-per-intent. Each variant is trained with `rasa train nlu`
+on config.yml and scored with `rasa test nlu` on the held-out examples. Run
+from the backend directory (needs rasa installed; takes minutes):
+
+    python benchmarks/bench_pruning.py [--target-count 1000] [--max-per-intent 150]
+"""
+import argparse
+import contextlib
+import io
+import json
+import random
+import subprocess
+import sys
+import tempfile
+import time
+from pathlib import Path
+
+sys.path.insert(0, str(Path(__file__).resolve().parents[1]))
+
+from augment_nlu import NLU_SOURCE, augment_nlu, load_nlu, save_nlu  # noqa: E402
+
+
+def split_nlu(nlu_data, test_share, seed):
+    """Returns (train, test) NLU data, holding out `test_share` of each intent's examples."""
+    rng = random.Random(seed)
+    train, test = [], []
+    for intent_data in nlu_data["nlu"]:
+        examples = [ex.strip().removeprefix("- ").strip() for ex in intent_data["examples"].split("\n- ")]
+        examples = [ex for ex in examples if ex]
+        rng.shuffle(examples)
+        held_out = max(1, round(len(examples) * test_share)) if len(examples) > 1 else 0
+        for target, chunk in ((test, examples[:held_out]), (train, examples[held_out:])):
+            if chunk:
+                target.append({"intent": intent_data["intent"], "examples": "- " + "\n- ".join(chunk)})
+    return {"version": "3.1", "nlu": train}, {"version": "3.1", "nlu": test}
+
+
+def run(command):
+    started = time.perf_counter()
+    subprocess.run(command, check=True, stdout=subprocess.DEVNULL)
+    return time.perf_counter() - started
+
+
+def evaluate(name, nlu_data, test_path, config, workdir):
+    train_path = workdir / f"{name}.yml"
+    with contextlib.redirect_stdout(io.StringIO()):
+        save_nlu(nlu_data, train_path)
+    examples = sum(len(item["examples"].split("\n- ")) for item in nlu_data["nlu"])
+
+    models = workdir / "models"
+    train_seconds = run(["rasa", "train", "nlu", "--config", config, "--nlu", str(train_path),
+                         "--out", str(models), "--fixed-model-name", name])
+    model = models / f"{name}.tar.gz"
+
+    results = workdir / f"results-{name}"
+    run(["rasa", "test", "nlu", "--config", config, "--model", str(model),
+         "--nlu", str(test_path), "--out", str(results)])
+    report = json.loads((results / "intent_report.json").read_text(encoding="utf-8"))
+
+    return {
+        "examples": examples,
+        "train_seconds": train_seconds,
+        "model_mb": model.stat().st_size / 1024 / 1024,
+        "weighted_f1": report["weighted avg"]["f1-score"],
+        "macro_f1": report["macro avg"]["f1-score"],
+    }
+
+
+def main():
+    parser = argparse.ArgumentParser()
+    parser.add_argument("--nlu", default=NLU_SOURCE)
+    parser.add_argument("--config", default="config.yml")
+    parser.add_argument("--target-count", type=int, default=1000)
+    parser.add_argument("--max-per-intent", type=int, default=150)
+    parser.add_argument("--test-share", type=float, default=0.2)
+    parser.add_argument("--seed", type=int, default=42)
+    args = parser.parse_args()
+
+    train, test = split_nlu(load_nlu(args.nlu), args.test_share, args.seed)
+    with contextlib.redirect_stdout(io.StringIO()):
+        full = augment_nlu(train, args.target_count, args.seed)
+        pruned = augment_nlu(train, args.target_count, args.seed, args.max_per_intent)
+
+    with tempfile.TemporaryDirectory() as tmp:
+        workdir = Path(tmp)
+        test_path = workdir / "test.yml"
+        with contextlib.redirect_stdout(io.StringIO()):
+            save_nlu(test, test_path)
+
+        rows = {
+            "full": evaluate("full", full, test_path, args.config, workdir),
+            "pruned": evaluate("pruned", pruned, test_path, args.config, workdir),
+        }
+
+    print(f"{'':<8} {'examples':>9} {'train s':>9} {'model MB':>9} {'weighted F1':>12} {'macro F1':>9}")
+    for name, row in rows.items():
+        print(f"{name:<8} {row['examples']:>9} {row['train_seconds']:>9.1f} {row['model_mb']:>9.1f}"
+              f" {row['weighted_f1']:>12.3f} {row['macro_f1']:>9.3f}")
+    speedup = rows["full"]["train_seconds"] / rows["pruned"]["train_seconds"]
+    print(f"training speed-up: {speedup:.1f}x, "
+          f"weighted F1 change: {rows['pruned']['weighted_f1'] - rows['full']['weighted_f1']:+.3f}")
+
+
+if __name__ == "__main__":
+    main()
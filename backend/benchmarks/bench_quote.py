@@ -0,0 +1,70 @@
+"""A quote sheet through the webhook, one model per message, versus one /quote request.
+
+Without --url only the resolution itself is timed: one `quotes` pass over the
+list, against one catalog match per line as the price action does it. With
+--url (a running server, e.g. http://localhost:5005) the same list is also
+sent both ways over HTTP. Run from the backend directory:
+
+    python benchmarks/bench_quote.py [--models 30] [--url http://localhost:5005]
+"""
+import argparse
+import asyncio
+import random
+import sys
+import time
+import timeit
+from pathlib import Path
+
+import aiohttp
+
+sys.path.insert(0, str(Path(__file__).resolve().parents[1]))
+
+from actions.catalog import CATALOG_STORE  # noqa: E402
+from channels.quotes import quotes  # noqa: E402
+
+
+def sheet(count, seed=0):
+    rng = random.Random(seed)
+    return [rng.choice(list(CATALOG_STORE.catalog.phones)).upper() for _ in range(count)]
+
+
+async def over_http(url, lines):
+    async with aiohttp.ClientSession(timeout=aiohttp.ClientTimeout(total=120)) as session:
+        started = time.perf_counter()
+        for line in lines:
+            async with session.post(url + "/webhooks/rest/webhook",
+                                    json={"sender": "bench-quote", "message": f"Bei ya {line}"}) as response:
+                await response.read()
+        webhook = time.perf_counter() - started
+
+        started = time.perf_counter()
+        async with session.post(url + "/webhooks/rest/quote", json={"models": lines},
+                                headers={"Accept": "application/json"}) as response:
+            body = await response.json()
+        quote = time.perf_counter() - started
+    matched = sum(row["match"] == "model" for row in body["quotes"])
+    print(f"{len(lines)} webhook calls {webhook * 1e3:10.1f} ms")
+    print(f"1 quote request  {quote * 1e3:10.1f} ms   {matched}/{len(lines)} matched a model")
+
+
+def parse_args():
+    parser = argparse.ArgumentParser(description="Compare per-model webhook calls with one bulk quote.")
+    parser.add_argument("--models", type=int, default=30)
+    parser.add_argument("--url", help="A running server to send the sheet to.")
+    return parser.parse_args()
+
+
+def main():
+    args = parse_args()
+    catalog = CATALOG_STORE.catalog
+    lines = sheet(args.models)
+    per_line = min(timeit.repeat(lambda: [catalog.match(line) for line in lines], number=200, repeat=3)) / 200
+    bulk = min(timeit.repeat(lambda: list(quotes(catalog, lines)), number=200, repeat=3)) / 200
+    print(f"catalog.match per line {per_line * 1e6:10.1f} us for {len(lines)} models")
+    print(f"quotes()               {bulk * 1e6:10.1f} us for {len(lines)} models")
+    if args.url:
+        asyncio.run(over_http(args.url.rstrip("/"), lines))
+
+
+if __name__ == "__main__":
+    main()
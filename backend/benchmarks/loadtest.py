@@ -0,0 +1,408 @@
+"""Records, generates and replays webhook traffic, and reports latency per intent and action.
+
+Traffic files are JSON lines, one user message each: {"sender", "message"}
+plus, for generated traffic, the "intent" it was drawn from.
+
+    # Put a recording proxy in front of a running server; point clients at :5006
+    python benchmarks/loadtest.py record --listen 5006 --target http://localhost:5005
+
+    # Or generate Swahili/English conversations from the domain's intents
+    python benchmarks/loadtest.py generate --conversations 500
+
+    # Replay against a server started here (or --url for a running one)
+    python benchmarks/loadtest.py replay --start --concurrency 16 --save-baseline benchmarks/baseline.json
+    python benchmarks/loadtest.py replay --start --concurrency 16 --baseline benchmarks/baseline.json
+
+Replay keeps each sender's messages in order and plays up to --concurrency
+conversations at once. Afterwards the conversation trackers (the server needs
+--enable-api, which serve.py sets) tell which intent each message got and
+which action answered it. With --baseline the run exits with status 1 when
+throughput or p50/p95/p99 latency got worse than the baseline by more than
+--tolerance. Run from the backend directory.
+"""
+import argparse
+import asyncio
+import json
+import math
+import random
+import subprocess
+import sys
+import time
+import uuid
+from collections import defaultdict
+from pathlib import Path
+
+import aiohttp
+import yaml
+from aiohttp import web
+
+BACKEND_DIR = Path(__file__).resolve().parents[1]
+sys.path.insert(0, str(BACKEND_DIR))
+
+from actions.catalog import CATALOG_STORE  # noqa: E402
+
+DEFAULT_TRAFFIC = BACKEND_DIR / "benchmarks" / "requests.jsonl"
+WEBHOOK = "/webhooks/rest/webhook"
+
+# Share of the middle of a conversation; most agents ask for a price or how to lock a phone.
+INTENT_WEIGHTS = {
+    "ask_specific_price": 0.30,
+    "ask_affordability": 0.04,
+    "specific_lock_phone": 0.2,
+    "phone_pricing": 0.08,
+    "ask_payment_methods": 0.08,
+    "ask_sales_process": 0.08,
+    "all_lock_solutions": 0.05,
+    "ask_maintenance": 0.05,
+    "ask_lost_phone": 0.05,
+    "ask_bot_identity": 0.03,
+    "lock_phone": 0.04,
+}
+
+# nlu.base.yml is mostly Swahili; these add the English agents write.
+ENGLISH_QUESTIONS = {
+    "greet": ["hello", "hi there", "good morning"],
+    "thank_you": ["thanks", "thank you very much", "ok thanks"],
+    "phone_pricing": ["show me all phone prices", "what are the prices of phones?"],
+    "ask_payment_methods": ["how can a customer pay?", "can I pay with M-Pesa?"],
+    "ask_sales_process": ["how do I register a customer?", "what is the sales process?"],
+}
+PRICE_QUESTIONS = ["Bei ya {} ni kiasi gani?", "Nipe bei ya {}", "{} inauzwa bei gani?",
+                   "How much is the {}?", "price of {}"]
+LOCK_QUESTIONS = ["Jinsi ya kulock {}", "Nawezaje kulock simu ya {}?", "How do I lock a {} phone?"]
+
+
+# Generating
+
+def load_examples(nlu_path, intents):
+    with open(nlu_path, "r", encoding="utf-8") as f:
+        nlu = yaml.safe_load(f)["nlu"]
+    examples = defaultdict(list)
+    for item in nlu:
+        if item["intent"] in intents:
+            for example in item["examples"].splitlines():
+                example = example.strip().removeprefix("- ").strip()
+                if example:
+                    examples[item["intent"]].append(example)
+    return examples
+
+
+def generate(conversations, seed, nlu_path=BACKEND_DIR / "nlu.base.yml", domain_path=BACKEND_DIR / "domain.yml"):
+    """Yields conversations of greet, a few questions and usually a thank-you."""
+    with open(domain_path, "r", encoding="utf-8") as f:
+        intents = set(yaml.safe_load(f)["intents"])
+    examples = load_examples(nlu_path, intents)
+    for intent, questions in ENGLISH_QUESTIONS.items():
+        examples[intent].extend(questions)
+
+    catalog = CATALOG_STORE.catalog
+    models = [model.upper() for model in catalog.phones]
+    brands = [brand.capitalize() for brand in catalog.brands]
+    locks = [solution.name for solution in catalog.locks.solutions.values()]
+    weights = {intent: weight for intent, weight in INTENT_WEIGHTS.items() if examples.get(intent) or intent in
+               ("ask_specific_price", "specific_lock_phone")}
+
+    rng = random.Random(seed)
+
+    def question(intent):
+        if intent == "ask_specific_price" and rng.random() < 0.7:
+            return rng.choice(PRICE_QUESTIONS).format(rng.choice(models if rng.random() < 0.8 else brands))
+        if intent == "specific_lock_phone" and rng.random() < 0.7:
+            return rng.choice(LOCK_QUESTIONS).format(rng.choice(brands + locks))
+        return rng.choice(examples[intent])
+
+    for number in range(conversations):
+        sender = f"agent-{number:05d}"
+        turns = ["greet"] if rng.random() < 0.8 else []
+        turns += rng.choices(list(weights), weights=list(weights.values()), k=rng.randint(1, 5))
+        if rng.random() < 0.6:
+            turns.append("thank_you")
+        for intent in turns:
+            yield {"sender": sender, "message": question(intent), "intent": intent}
+
+
+def write_traffic(records, path):
+    with open(path, "w", encoding="utf-8") as f:
+        for record in records:
+            f.write(json.dumps(record, ensure_ascii=False) + "\n")
+
+
+def read_traffic(path):
+    with open(path, "r", encoding="utf-8") as f:
+        return [json.loads(line) for line in f if line.strip()]
+
+
+# Recording
+
+async def record(listen, target, path):
+    """Forwards every request to `target` and appends each webhook message to `path`."""
+    session = aiohttp.ClientSession()
+    out = open(path, "a", encoding="utf-8")
+
+    async def forward(request):
+        body = await request.read()
+        if request.path == WEBHOOK and request.method == "POST":
+            try:
+                payload = json.loads(body)
+                out.write(json.dumps({"sender": payload.get("sender"), "message": payload.get("message"),
+                                      "ts": time.time()}, ensure_ascii=False) + "\n")
+                out.flush()
+            except ValueError:
+                pass
+        async with session.request(request.method, target + request.rel_url.path_qs, data=body,
+                                   headers={"Content-Type": request.headers.get("Content-Type", "application/json")}) as upstream:
+            return web.Response(status=upstream.status, body=await upstream.read(),
+                                content_type=upstream.content_type)
+
+    app = web.Application()
+    app.router.add_route("*", "/{tail:.*}", forward)
+    runner = web.AppRunner(app)
+    await runner.setup()
+    await web.TCPSite(runner, "0.0.0.0", listen).start()
+    print(f"Recording {WEBHOOK} on :{listen} -> {target} into {path}; Ctrl+C to stop")
+    try:
+        await asyncio.Event().wait()
+    finally:
+        await runner.cleanup()
+        await session.close()
+        out.close()
+
+
+# Replaying
+
+async def replay(records, url, concurrency):
+    """Plays each sender's messages in order, `concurrency` senders at a time."""
+    run_id = uuid.uuid4().hex[:8]
+    conversations = defaultdict(list)
+    for record in records:
+        conversations[f"{run_id}-{record['sender']}"].append(record)
+    pending = asyncio.Queue()
+    for sender in conversations:
+        pending.put_nowait(sender)
+    results = []
+
+    async def play(session):
+        while not pending.empty():
+            sender = pending.get_nowait()
+            for turn, record in enumerate(conversations[sender]):
+                started = time.perf_counter()
+                try:
+                    async with session.post(url + WEBHOOK, json={"sender": sender, "message": record["message"]}) as response:
+                        await response.read()
+                        status = response.status
+                except (aiohttp.ClientError, asyncio.TimeoutError):
+                    status = None
+                results.append({"sender": sender, "turn": turn, "message": record["message"],
+                                "latency": time.perf_counter() - started, "status": status,
+                                "intent": record.get("intent")})
+
+    connector = aiohttp.TCPConnector(limit=concurrency)
+    async with aiohttp.ClientSession(connector=connector, timeout=aiohttp.ClientTimeout(total=120)) as session:
+        started = time.perf_counter()
+        await asyncio.gather(*(play(session) for _ in range(concurrency)))
+        elapsed = time.perf_counter() - started
+        await annotate(results, url, session)
+    return results, elapsed
+
+
+async def annotate(results, url, session):
+    """Fills in the intent the server parsed and the action that answered, from the trackers."""
+    by_sender = defaultdict(list)
+    for result in results:
+        by_sender[result["sender"]].append(result)
+
+    for sender, turns in by_sender.items():
+        try:
+            async with session.get(f"{url}/conversations/{sender}/tracker") as response:
+                events = (await response.json())["events"] if response.status == 200 else []
+        except (aiohttp.ClientError, asyncio.TimeoutError, ValueError, KeyError):
+            events = []
+
+        parsed = []
+        for event in events:
+            if event.get("event") == "user":
+                # Fast-path messages are stored rewritten, with the sent text in the metadata
+                text = (event.get("metadata") or {}).get("text") or event.get("text") or ""
+                intent = (event.get("parse_data") or {}).get("intent", {}).get("name")
+                parsed.append([text.strip(), intent, None])
+            elif event.get("event") == "action" and parsed and parsed[-1][2] is None \
+                    and event.get("name") not in ("action_listen", "action_session_start"):
+                parsed[-1][2] = event.get("name")
+
+        # A compacted tracker may have lost the first turns, so line up from the end.
+        # Failed requests never reached the tracker, and a turn whose text is not
+        # the next user event's is left unlabelled instead of shifting the rest.
+        turns = sorted((result for result in turns if result["status"] is not None), key=lambda result: result["turn"])
+        index = len(parsed) - 1
+        for result in reversed(turns):
+            if index < 0:
+                break
+            text, intent, action = parsed[index]
+            if text != result["message"].strip():
+                continue
+            result["intent"] = intent or result.get("intent")
+            result["action"] = action
+            index -= 1
+
+
+def percentiles(latencies):
+    ordered = sorted(latencies)
+
+    def rank(p):
+        return ordered[min(len(ordered) - 1, max(0, math.ceil(p / 100 * len(ordered)) - 1))] * 1000
+
+    return {"count": len(ordered), "p50": rank(50), "p95": rank(95), "p99": rank(99)}
+
+
+def summarize(results, elapsed):
+    ok = [result for result in results if result["status"] == 200]
+    summary = {
+        "requests": len(results),
+        "errors": len(results) - len(ok),
+        "throughput": len(ok) / elapsed if elapsed else 0.0,
+        "overall": percentiles([result["latency"] for result in ok]) if ok else {},
+        "by_intent": {},
+        "by_action": {},
+    }
+    for key, group in (("by_intent", "intent"), ("by_action", "action")):
+        latencies = defaultdict(list)
+        for result in ok:
+            latencies[result.get(group) or "unknown"].append(result["latency"])
+        summary[key] = {name: percentiles(values) for name, values in sorted(latencies.items())}
+    return summary
+
+
+def print_summary(summary):
+    print(f"{summary['requests']} requests, {summary['errors']} errors, {summary['throughput']:.1f} req/s")
+    print(f"{'':<28} {'count':>6} {'p50 ms':>8} {'p95 ms':>8} {'p99 ms':>8}")
+
+    def row(name, stats):
+        print(f"{name:<28} {stats['count']:>6} {stats['p50']:>8.1f} {stats['p95']:>8.1f} {stats['p99']:>8.1f}")
+
+    if summary["overall"]:
+        row("all", summary["overall"])
+    for key, title in (("by_intent", "intent"), ("by_action", "action")):
+        print(f"-- by {title}")
+        for name, stats in summary[key].items():
+            row(name, stats)
+
+
+def regressions(summary, baseline, tolerance, min_count=20):
+    """Lists every metric that is worse than the baseline by more than `tolerance`."""
+    found = []
+    if summary["throughput"] < baseline["throughput"] * (1 - tolerance):
+        found.append(f"throughput {summary['throughput']:.1f} < {baseline['throughput']:.1f} req/s")
+    groups = [("all", summary["overall"], baseline["overall"])]
+    for key in ("by_intent", "by_action"):
+        for name, stats in summary[key].items():
+            if name in baseline[key]:
+                groups.append((name, stats, baseline[key][name]))
+    for name, stats, before in groups:
+        if not stats or not before or min(stats["count"], before["count"]) < min_count:
+            continue
+        for metric in ("p50", "p95", "p99"):
+            if stats[metric] > before[metric] * (1 + tolerance):
+                found.append(f"{name} {metric} {stats[metric]:.1f} > {before[metric]:.1f} ms")
+    return found
+
+
+# Servers
+
+def start_servers(port, model):
+    processes = [subprocess.Popen(["rasa", "run", "actions", "--port", "5055"], cwd=BACKEND_DIR)]
+    serve = [sys.executable, "serve.py", "--port", str(port)] + (["--model", model] if model else [])
+    processes.append(subprocess.Popen(serve, cwd=BACKEND_DIR))
+    return processes
+
+
+async def wait_until_ready(url, timeout):
+    deadline = time.monotonic() + timeout
+    async with aiohttp.ClientSession() as session:
+        while time.monotonic() < deadline:
+            try:
+                async with session.get(url + "/ready") as response:
+                    if response.status == 200:
+                        return
+            except aiohttp.ClientError:
+                pass
+            await asyncio.sleep(0.5)
+    raise TimeoutError(f"{url} was not ready within {timeout}s")
+
+
+def run_replay(args):
+    records = read_traffic(args.traffic)
+    if args.limit:
+        records = records[:args.limit]
+    url = args.url or f"http://localhost:{args.port}"
+    processes = start_servers(args.port, args.model) if args.start else []
+    try:
+        if processes:
+            asyncio.run(wait_until_ready(url, args.ready_timeout))
+        results, elapsed = asyncio.run(replay(records, url, args.concurrency))
+    finally:
+        for process in processes:
+            process.terminate()
+            process.wait()
+
+    summary = summarize(results, elapsed)
+    summary["concurrency"] = args.concurrency
+    print_summary(summary)
+    if args.save_baseline:
+        Path(args.save_baseline).write_text(json.dumps(summary, indent=2), encoding="utf-8")
+        print(f"Saved baseline {args.save_baseline}")
+    if args.baseline:
+        baseline = json.loads(Path(args.baseline).read_text(encoding="utf-8"))
+        found = regressions(summary, baseline, args.tolerance)
+        for line in found:
+            print(f"REGRESSION {line}")
+        if found:
+            sys.exit(1)
+        print(f"No regressions against {args.baseline} (tolerance {args.tolerance:.0%})")
+
+
+def parse_args():
+    parser = argparse.ArgumentParser(description="Record, generate and replay webhook traffic.")
+    commands = parser.add_subparsers(dest="command", required=True)
+
+    record_parser = commands.add_parser("record", help="Proxy a server and append its webhook messages to a file.")
+    record_parser.add_argument("--listen", type=int, default=5006)
+    record_parser.add_argument("--target", default="http://localhost:5005")
+    record_parser.add_argument("--traffic", default=str(DEFAULT_TRAFFIC))
+
+    generate_parser = commands.add_parser("generate", help="Write synthetic conversations drawn from the domain.")
+    generate_parser.add_argument("--conversations", type=int, default=500)
+    generate_parser.add_argument("--seed", type=int, default=42)
+    generate_parser.add_argument("--traffic", default=str(DEFAULT_TRAFFIC))
+
+    replay_parser = commands.add_parser("replay", help="Replay a traffic file and report latency.")
+    replay_parser.add_argument("--traffic", default=str(DEFAULT_TRAFFIC))
+    replay_parser.add_argument("--url", help="A running server; default is localhost:--port.")
+    replay_parser.add_argument("--port", type=int, default=5005)
+    replay_parser.add_argument("--start", action="store_true", help="Start the action server and serve.py first.")
+    replay_parser.add_argument("--model", help="Model for serve.py when --start is given.")
+    replay_parser.add_argument("--ready-timeout", type=float, default=300)
+    replay_parser.add_argument("--concurrency", type=int, default=8)
+    replay_parser.add_argument("--limit", type=int, help="Replay only the first N messages.")
+    replay_parser.add_argument("--save-baseline")
+    replay_parser.add_argument("--baseline")
+    replay_parser.add_argument("--tolerance", type=float, default=0.2)
+    return parser.parse_args()
+
+
+def main():
+    args = parse_args()
+    if args.command == "record":
+        try:
+            asyncio.run(record(args.listen, args.target, args.traffic))
+        except KeyboardInterrupt:
+            pass
+    elif args.command == "generate":
+        records = list(generate(args.conversations, args.seed))
+        write_traffic(records, args.traffic)
+        print(f"Wrote {len(records)} messages in {args.conversations} conversations to {args.traffic}")
+    else:
+        run_replay(args)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,165 @@
+"""Single entry point for refreshing the bot: extract -> augment -> train.
+
+Every stage has a set of inputs (files plus the arguments it runs with).
+Their content hashes are stored in .build_manifest.json after the stage
+succeeds, and a stage whose inputs hash the same as last time is skipped.
+Hand-written NLU examples live in nlu.base.yml and the domain in
+domain.yml; extract only writes generated files under extracted/, and its
+examples are merged into the hand-written ones when they are augmented
+into data/nlu.yml. When only the NLU examples changed since the last
+trained model, training fine-tunes that model instead of starting from
+scratch. Run from the backend directory:
+
+    python build.py [pdfs ...] [--target-count 1000] [--max-per-intent N] [--force]
+"""
+import argparse
+import json
+import os
+import subprocess
+import sys
+import time
+from pathlib import Path
+
+from augment_nlu import NLU_EXTRACTED, NLU_PATH, NLU_SOURCE
+from extract import file_digest, find_pdfs
+
+BACKEND_DIR = Path(__file__).resolve().parent
+MANIFEST_PATH = BACKEND_DIR / ".build_manifest.json"
+MODELS_DIR = BACKEND_DIR / "models"
+
+TRAINING_FILES = ["config.yml", "domain.yml", "data/rules.yml", "data/stories.yml"]
+
+def fingerprint(paths, args=()):
+    """Maps every input file (or "missing") and the stage arguments to their hashes."""
+    digests = {str(path): file_digest(BACKEND_DIR / path) if (BACKEND_DIR / path).exists() else "missing"
+               for path in paths}
+    digests["args"] = " ".join(str(arg) for arg in args)
+    return digests
+
+def load_manifest():
+    if MANIFEST_PATH.exists():
+        return json.loads(MANIFEST_PATH.read_text(encoding="utf-8"))
+    return {"stages": {}}
+
+def save_manifest(manifest):
+    tmp_path = MANIFEST_PATH.with_suffix(".tmp")
+    tmp_path.write_text(json.dumps(manifest, indent=2, sort_keys=True), encoding="utf-8")
+    os.replace(tmp_path, MANIFEST_PATH)
+
+def run(command):
+    print("$ " + " ".join(str(part) for part in command), flush=True)
+    subprocess.run([str(part) for part in command], cwd=BACKEND_DIR, check=True)
+
+def changed_inputs(recorded, current):
+    return sorted(key for key in current.keys() | recorded.keys() if recorded.get(key) != current.get(key))
+
+class Build:
+    def __init__(self, args):
+        self.args = args
+        self.manifest = load_manifest()
+        self.timings = []
+
+    def stage(self, name, inputs, action, outputs_present=True):
+        """Runs `action` unless the inputs are unchanged, then records their post-run hashes.
+
+        The hashes are taken again after the action so that a stage which
+        rewrites one of its inputs is not seen as changed on the next build.
+        """
+        paths, args = inputs
+        recorded = self.manifest["stages"].get(name)
+        current = fingerprint(paths, args)
+        started = time.perf_counter()
+
+        if recorded == current and outputs_present and not self.args.force:
+            status = "unchanged, skipped"
+        else:
+            try:
+                status = action(recorded or {}, current) or "done"
+            except subprocess.CalledProcessError:
+                self.timings.append((name, time.perf_counter() - started, "failed"))
+                raise
+            self.manifest["stages"][name] = fingerprint(paths, args)
+            save_manifest(self.manifest)
+
+        self.timings.append((name, time.perf_counter() - started, status))
+
+    def extract(self):
+        pdfs = [str(path.relative_to(BACKEND_DIR)) if path.is_relative_to(BACKEND_DIR) else str(path)
+                for path in find_pdfs(self.args.pdfs)]
+        if not pdfs:
+            self.timings.append(("extract", 0.0, "no PDFs found, skipped"))
+            return
+
+        def action(recorded, current):
+            run([sys.executable, "extract.py", *pdfs, "--workers", self.args.workers])
+
+        self.stage("extract", (["extract.py", *pdfs], ()), action)
+
+    def augment(self):
+        args = ["--target-count", self.args.target_count, "--seed", self.args.seed]
+        if self.args.max_per_intent is not None:
+            args += ["--max-per-intent", self.args.max_per_intent]
+
+        def action(recorded, current):
+            run([sys.executable, "augment_nlu.py", *args])
+
+        # Hand edits go to NLU_SOURCE; data/nlu.yml is only ever written from it
+        self.stage("augment", (["augment_nlu.py", NLU_SOURCE, NLU_EXTRACTED], args), action,
+                   outputs_present=(BACKEND_DIR / NLU_PATH).exists())
+
+    def train(self):
+        previous = self.manifest.get("model")
+        has_model = bool(previous) and (BACKEND_DIR / previous).exists()
+        model_name = time.strftime("build-%Y%m%d-%H%M%S")
+
+        def action(recorded, current):
+            command = ["rasa", "train", "--out", MODELS_DIR, "--fixed-model-name", model_name]
+            changed = changed_inputs(recorded, current)
+            finetune = has_model and changed == [NLU_PATH] and not self.args.force
+            if finetune:
+                command += ["--finetune", previous, "--epoch-fraction", self.args.epoch_fraction]
+            run(command)
+            self.manifest["model"] = str((MODELS_DIR / f"{model_name}.tar.gz").relative_to(BACKEND_DIR))
+            return f"fine-tuned {previous}" if finetune else "trained from scratch"
+
+        self.stage("train", ([NLU_PATH, *TRAINING_FILES], ()), action, outputs_present=has_model)
+
+    def report(self):
+        total = 0.0
+        for name, seconds, status in self.timings:
+            total += seconds
+            print(f"{name:<8} {seconds:8.1f}s  {status}")
+        print(f"{'total':<8} {total:8.1f}s")
+        if self.manifest.get("model"):
+            print(f"Model: {self.manifest['model']}")
+
+def parse_args():
+    parser = argparse.ArgumentParser(description="Extract, augment and train, skipping unchanged stages.")
+    parser.add_argument("pdfs", nargs="*", default=["MwongozoMauzo.pdf", "vianzio.pdf"],
+                        help="PDF files or directories to search for PDFs.")
+    parser.add_argument("--workers", type=int, default=os.cpu_count() or 1)
+    parser.add_argument("--target-count", type=int, default=1000)
+    parser.add_argument("--seed", type=int, default=42)
+    parser.add_argument("--max-per-intent", type=int)
+    parser.add_argument("--epoch-fraction", type=float, default=0.2,
+                        help="Share of the configured epochs used when fine-tuning.")
+    parser.add_argument("--force", action="store_true", help="Run every stage and train from scratch.")
+    return parser.parse_args()
+
+def main():
+    args = parse_args()
+    # PDF paths are taken relative to where the build was started
+    args.pdfs = [str(Path(path).resolve()) for path in args.pdfs]
+    os.chdir(BACKEND_DIR)
+    build = Build(args)
+    try:
+        build.extract()
+        build.augment()
+        build.train()
+    except subprocess.CalledProcessError as e:
+        build.report()
+        sys.exit(e.returncode)
+    build.report()
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,59 @@
+"""Routes unambiguous price and lock questions around the NLU pipeline.
+
+A message that is little more than a catalog model name, or that names a
+model, brand or lock type next to a clear price or lock word, already says
+everything the price and lock actions need.
+`route` turns such a message into Rasa's `/intent{"entity": "value"}` form,
+which the server parses with its regex handler instead of running the
+featurizers and DIET. Anything else returns None and goes through NLU, and
+so does any message naming a sum of money: "Tecno kwa kianzio cha 100,000"
+is a budget question, not a Tecno price question, and "Matengenezo ya vivo
+y03 4/64gb yanafanyika wapi?" is a repair question that happens to name a model.
+"""
+import json
+from typing import Dict, NamedTuple, Optional, Text
+
+from actions.affordability import mentions_amount
+from actions.catalog import PhoneCatalog, tokenize
+
+PRICE_INTENT = "ask_specific_price"
+LOCK_INTENT = "specific_lock_phone"
+
+PRICE_CUES = frozenset(["bei", "price", "prices", "kianzio", "gharama", "inagharimu", "cost", "inauzwa"])
+# Matched as substrings so that "kulock", "inalock" and "kufunga" count too.
+LOCK_CUES = ("lock", "funga")
+# Without a price word, a model name must make up this share of the message:
+# "OPPO A18 4/64GB" and "Nataka oppo a18 4/64gb" are price questions
+MODEL_ONLY_COVERAGE = 0.75
+
+
+class FastPath(NamedTuple):
+    intent: Text
+    entities: Dict[Text, Text]
+
+    @property
+    def message(self) -> Text:
+        return f"/{self.intent}{json.dumps(self.entities)}"
+
+
+def route(text: Text, catalog: PhoneCatalog) -> Optional[FastPath]:
+    """Returns the intent and entities of `text` when the catalog alone can answer it."""
+    if not text or text.startswith("/") or mentions_amount(text):
+        return None
+
+    tokens = tokenize(text)
+    asks_price = any(token in PRICE_CUES for token in tokens)
+    asks_lock = any(cue in token for token in tokens for cue in LOCK_CUES)
+    if asks_price and asks_lock:
+        return None
+
+    match, coverage = catalog.match_with_confidence(text)
+    if match.lock_type and not asks_price:
+        return FastPath(LOCK_INTENT, {"lock_type": match.lock_type})
+    if match.brand and asks_lock:
+        return FastPath(LOCK_INTENT, {"phone_brand": match.brand})
+    if match.model and (asks_price or coverage >= MODEL_ONLY_COVERAGE):
+        return FastPath(PRICE_INTENT, {"phone_model": match.model})
+    if match.brand and asks_price:
+        return FastPath(PRICE_INTENT, {"phone_brand": match.brand})
+    return None
@@ -0,0 +1,98 @@
+"""Cache of NLU parse results in front of the model's pipeline.
+
+Agents send the same few questions over and over, and each one used to be
+featurized and run through DIET again. `ParseCache.install` wraps the
+agent's `processor.parse_message` so a message whose normalized text was
+parsed recently by the same model gets the stored result back. Entries live
+in an LRU of bounded size and expire after a TTL; a new model brings a new
+model id, so results of the old one are never served. Entity offsets in a
+cached result refer to the text that was parsed first. Results with and
+without the internal message properties are kept apart.
+"""
+import copy
+import os
+import re
+import time
+from collections import OrderedDict
+from typing import Any, Dict, Optional, Text, Tuple
+
+_TOKEN = re.compile(r"[\w/+-]+")
+
+
+def normalize(text: Text) -> Text:
+    """Lowercases `text` and drops punctuation and extra whitespace."""
+    return " ".join(_TOKEN.findall(text.lower()))
+
+
+class ParseCache:
+    """Parse results keyed by (model id, output-only flag, normalized text), in an LRU whose entries expire."""
+
+    def __init__(self, maxsize: int = 1024, ttl: float = 3600.0) -> None:
+        self.maxsize = maxsize
+        self.ttl = ttl
+        self._entries: "OrderedDict[Tuple[Text, bool, Text], Tuple[float, Dict[Text, Any]]]" = OrderedDict()
+        self.hits = 0
+        self.misses = 0
+        self.expired = 0
+
+    def get(self, model_id: Text, text: Text, only_output_properties: bool = True) -> Optional[Dict[Text, Any]]:
+        key = (model_id, only_output_properties, normalize(text))
+        entry = self._entries.get(key)
+        if entry is not None and entry[0] < time.monotonic():
+            del self._entries[key]
+            self.expired += 1
+            entry = None
+        if entry is None:
+            self.misses += 1
+            return None
+        self._entries.move_to_end(key)
+        self.hits += 1
+        result = copy.deepcopy(entry[1])
+        result["text"] = text
+        return result
+
+    def put(self, model_id: Text, text: Text, result: Dict[Text, Any], only_output_properties: bool = True) -> None:
+        key = (model_id, only_output_properties, normalize(text))
+        self._entries[key] = (time.monotonic() + self.ttl, copy.deepcopy(result))
+        self._entries.move_to_end(key)
+        while len(self._entries) > self.maxsize:
+            self._entries.popitem(last=False)
+
+    def install(self, agent: Any) -> None:
+        """Wraps the parse method of the agent's current processor, once per processor."""
+        processor = getattr(agent, "processor", None)
+        if processor is None or getattr(processor, "parse_cache", None) is self:
+            return
+        parse_message = processor.parse_message
+        model_id = processor.model_metadata.model_id
+
+        # Same signature as MessageProcessor.parse_message
+        async def cached_parse_message(message: Any, only_output_properties: bool = True) -> Dict[Text, Any]:
+            text = message.text
+            # Intent syntax ("/greet") is already cheap to parse
+            if not text or text.startswith("/"):
+                return await parse_message(message, only_output_properties)
+            result = self.get(model_id, text, only_output_properties)
+            if result is None:
+                result = await parse_message(message, only_output_properties)
+                self.put(model_id, text, result, only_output_properties)
+            return result
+
+        processor.parse_message = cached_parse_message
+        processor.parse_cache = self
+
+    def stats(self) -> Dict[Text, Any]:
+        lookups = self.hits + self.misses
+        return {
+            "hits": self.hits,
+            "misses": self.misses,
+            "expired": self.expired,
+            "size": len(self._entries),
+            "hit_rate": round(self.hits / lookups, 4) if lookups else 0.0,
+        }
+
+
+PARSE_CACHE = ParseCache(
+    maxsize=int(os.environ.get("NLU_CACHE_SIZE", "1024")),
+    ttl=float(os.environ.get("NLU_CACHE_TTL_SECONDS", "3600")),
+)
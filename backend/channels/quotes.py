@@ -0,0 +1,68 @@
+"""Prices for a list of models in one request, for quote sheets.
+
+A branch manager pastes 10-30 model names; sending each one through the
+webhook costs an NLU parse, an action call and a reply the UI has to parse
+back into a table. `quotes` resolves every line against the catalog's
+automaton directly and yields one structured row per line: the catalog
+prices, how the line matched ("model", "brand" or "none") and the match
+confidence. A line that names a brand but no single model lists the
+brand's models that contain all of its words as candidates.
+"""
+import re
+from typing import Any, Dict, Iterable, Iterator, List, Text
+
+from actions.catalog import PRICE_FIELDS, PhoneCatalog, tokenize
+
+# Longer lists are refused, so that one request cannot hold a worker for long
+MAX_QUOTE_LINES = 1000
+# Longer lists are streamed as NDJSON, this many rows per chunk
+STREAM_THRESHOLD = 100
+STREAM_BATCH = 50
+# Pasted lists come one model per line, or separated by commas or semicolons
+_SEPARATORS = re.compile(r"[\n;]+|,(?!\d{3})")
+
+
+def quote_lines(payload: Any) -> List[Text]:
+    """The model strings of a request body: {"models": [...]} or {"text": "<pasted list>"}."""
+    if not isinstance(payload, dict):
+        raise ValueError("expected a JSON object with 'models' or 'text'")
+    models = payload.get("models")
+    if models is None:
+        text = payload.get("text")
+        if not isinstance(text, str):
+            raise ValueError("expected 'models' (a list of strings) or 'text' (a pasted list)")
+        models = _SEPARATORS.split(text)
+    if not isinstance(models, list) or not all(isinstance(model, str) for model in models):
+        raise ValueError("'models' must be a list of strings")
+    lines = [model.strip().lstrip("-*").strip() for model in models]
+    lines = [line for line in lines if line]
+    if len(lines) > MAX_QUOTE_LINES:
+        raise ValueError(f"at most {MAX_QUOTE_LINES} models per request, got {len(lines)}")
+    return lines
+
+
+def quote(catalog: PhoneCatalog, line: Text) -> Dict[Text, Any]:
+    match, confidence = catalog.match_with_confidence(line)
+    row: Dict[Text, Any] = {"query": line, "model": match.model, "brand": match.brand}
+    if match.model:
+        info = catalog.get(match.model)
+        row.update(match="model", confidence=round(confidence, 3), lock_solution=info.lock_solution)
+        row.update({field: getattr(info, field) for field in PRICE_FIELDS})
+        return row
+    if match.brand:
+        words = set(tokenize(line))
+        candidates = [model for model in catalog.models_for_brand(match.brand) if words <= set(tokenize(model))]
+        row.update(match="brand", confidence=0.0, candidates=candidates)
+        return row
+    row.update(match="none", confidence=0.0)
+    return row
+
+
+def quotes(catalog: PhoneCatalog, lines: Iterable[Text]) -> Iterator[Dict[Text, Any]]:
+    """One row per line, in order; repeated lines are resolved once."""
+    resolved: Dict[Text, Dict[Text, Any]] = {}
+    for line in lines:
+        key = line.lower()
+        if key not in resolved:
+            resolved[key] = quote(catalog, line)
+        yield {**resolved[key], "query": line}
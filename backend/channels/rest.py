@@ -0,0 +1,111 @@
+"""REST channel that sends catalog lookups down the fast path.
+
+Registered in credentials.yml in place of the built-in `rest` channel; it
+keeps the name, so clients still post to /webhooks/rest/webhook. Every
+message's metadata records the route it took ("fast_path" or "nlu") and,
+for rewritten messages, the text the user actually sent. Messages that do go
+through NLU are answered from the parse cache when they were seen recently.
+GET /webhooks/rest/stats returns the route counts, the cache's hit rate and,
+with the local tracker store, its session counts and memory use.
+
+POST /webhooks/rest/quote prices a list of models in one request, without
+NLU or the action server: {"models": ["OPPO A18 4/64GB", ...]} (or {"text":
+"<pasted list>"}) returns {"version": ..., "quotes": [...]}. Lists longer
+than STREAM_THRESHOLD, or any list sent with "Accept: application/x-ndjson",
+come back as one JSON row per line, streamed as they are resolved; clients
+that send "Accept: application/json" always get the single document.
+"""
+import json
+import logging
+from collections import Counter
+from typing import Any, Awaitable, Callable, Dict, Optional, Text
+
+from rasa.core.channels.channel import UserMessage
+from rasa.core.channels.rest import RestInput
+from sanic import Blueprint, response
+from sanic.exceptions import SanicException
+from sanic.request import Request
+from sanic.response import HTTPResponse
+
+from actions.catalog import CATALOG_STORE
+from .fast_path import route
+from .parse_cache import PARSE_CACHE
+from .quotes import STREAM_BATCH, STREAM_THRESHOLD, quote_lines, quotes
+
+logger = logging.getLogger(__name__)
+
+
+class FastPathRestInput(RestInput):
+    @classmethod
+    def name(cls) -> Text:
+        return "rest"
+
+    def __init__(self) -> None:
+        super().__init__()
+        self.routes: Counter = Counter()
+        self.quoted: Counter = Counter()
+        CATALOG_STORE.start()
+
+    def blueprint(self, on_new_message: Callable[[UserMessage], Awaitable[Any]]) -> Blueprint:
+        custom_webhook = super().blueprint(on_new_message)
+
+        @custom_webhook.route("/stats", methods=["GET"])
+        async def stats(request: Request) -> HTTPResponse:
+            body = {"routes": dict(self.routes), "quotes": dict(self.quoted), "parse_cache": PARSE_CACHE.stats()}
+            # Custom tracker stores come wrapped in an AwaitableTrackerStore
+            tracker_store = getattr(request.app.ctx.agent, "tracker_store", None)
+            tracker_store = getattr(tracker_store, "_tracker_store", tracker_store)
+            if hasattr(tracker_store, "stats"):
+                body["tracker_store"] = tracker_store.stats()
+            return response.json(body)
+
+        @custom_webhook.route("/quote", methods=["POST"])
+        async def quote(request: Request) -> Optional[HTTPResponse]:
+            try:
+                lines = quote_lines(request.json)
+            except (ValueError, SanicException) as e:
+                return response.json({"error": str(e)}, status=400)
+            catalog = CATALOG_STORE.catalog
+            rows = quotes(catalog, lines)
+            accept = request.headers.get("accept", "")
+            streamed = "application/x-ndjson" in accept or (len(lines) > STREAM_THRESHOLD and "application/json" not in accept)
+            if not streamed:
+                rows = list(rows)
+                self.quoted.update(row["match"] for row in rows)
+                return response.json({"version": catalog.version, "quotes": rows})
+
+            stream = await request.respond(content_type="application/x-ndjson",
+                                           headers={"X-Catalog-Version": catalog.version})
+            batch = []
+            for row in rows:
+                self.quoted[row["match"]] += 1
+                batch.append(json.dumps(row))
+                if len(batch) == STREAM_BATCH:
+                    await stream.send("\n".join(batch) + "\n")
+                    batch = []
+            if batch:
+                await stream.send("\n".join(batch) + "\n")
+            await stream.eof()
+            return None
+
+        return custom_webhook
+
+    def _extract_message(self, req: Request) -> Optional[Text]:
+        # A reloaded model comes with a new processor, which gets wrapped on its first message
+        PARSE_CACHE.install(req.app.ctx.agent)
+        text = super()._extract_message(req)
+        fast_path = route(text, CATALOG_STORE.catalog) if isinstance(text, str) else None
+        req.ctx.original_text, req.ctx.fast_path = text, fast_path
+        self.routes["fast_path" if fast_path else "nlu"] += 1
+        if fast_path is None:
+            return text
+        logger.debug("Fast path for %r: %s", text, fast_path.message)
+        return fast_path.message
+
+    def get_metadata(self, request: Request) -> Optional[Dict[Text, Any]]:
+        metadata = dict(super().get_metadata(request) or {})
+        fast_path = getattr(request.ctx, "fast_path", None)
+        metadata["route"] = "fast_path" if fast_path else "nlu"
+        if fast_path:
+            metadata["text"] = request.ctx.original_text
+        return metadata
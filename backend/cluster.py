@@ -0,0 +1,246 @@
+"""Runs several Rasa and action-server processes behind one local router.
+
+One `rasa run` process handles one DIET inference at a time, so a slow parse
+holds up every other agent. This script supervises N Rasa workers (serve.py)
+and M action servers, restarting any that exit, and runs a small aiohttp
+router in front of them:
+
+- on --port (the public $PORT), requests carrying a `sender` go to the Rasa
+  worker picked by a hash of the sender, so a conversation always lands on
+  the process that holds its tracker; /ready is answered only when every
+  worker is ready, with the same CORS header as the workers (--cors);
+- on --action-port (5055, the action_endpoint in endpoints.yml), calls from
+  the Rasa workers are spread round-robin over the action servers through a
+  keep-alive connection pool.
+
+Each Rasa worker loads its own copy of the model, so memory grows with N.
+Run from the backend directory:
+
+    python cluster.py --port $PORT [--workers 4] [--action-workers 2]
+"""
+import argparse
+import asyncio
+import itertools
+import json
+import os
+import signal
+import subprocess
+import sys
+import time
+import zlib
+from pathlib import Path
+
+import aiohttp
+from aiohttp import web
+
+BACKEND_DIR = Path(__file__).resolve().parent
+RESTART_DELAY_SECONDS = 2.0
+# Headers that describe one hop rather than the request itself
+HOP_HEADERS = frozenset(["connection", "keep-alive", "transfer-encoding", "content-length", "host", "upgrade"])
+
+def sender_worker(sender, workers):
+    """Picks the worker for a conversation; stable across router restarts."""
+    return zlib.crc32(sender.encode("utf-8")) % workers
+
+class Process:
+    """A child process that is started again whenever it exits."""
+
+    def __init__(self, name, command, env=None):
+        self.name = name
+        self.command = command
+        self.env = env
+        self.popen = None
+        self.restarts = 0
+
+    def start(self):
+        self.popen = subprocess.Popen(self.command, cwd=BACKEND_DIR, env=self.env)
+
+    async def supervise(self, stopping):
+        self.start()
+        while not stopping.is_set():
+            await asyncio.sleep(1)
+            if self.popen.poll() is not None and not stopping.is_set():
+                print(f"{self.name} exited with {self.popen.returncode}, restarting", flush=True)
+                await asyncio.sleep(RESTART_DELAY_SECONDS)
+                self.restarts += 1
+                self.start()
+
+    def stop(self):
+        if self.popen is not None and self.popen.poll() is None:
+            self.popen.terminate()
+
+    def wait(self, timeout=10):
+        if self.popen is None:
+            return
+        try:
+            self.popen.wait(timeout)
+        except subprocess.TimeoutExpired:
+            self.popen.kill()
+
+class Router:
+    def __init__(self, worker_urls, action_urls, pool_size=64):
+        self.worker_urls = worker_urls
+        self.action_urls = action_urls
+        self._next_action = itertools.cycle(range(len(action_urls)))
+        self._next_worker = itertools.cycle(range(len(worker_urls)))
+        self.pool_size = pool_size
+        self.session = None
+
+    async def start(self, app):
+        connector = aiohttp.TCPConnector(limit=self.pool_size, keepalive_timeout=60)
+        # Bodies are passed through as they are, still compressed if they were
+        self.session = aiohttp.ClientSession(connector=connector, timeout=aiohttp.ClientTimeout(total=120),
+                                             auto_decompress=False)
+
+    async def close(self, app):
+        await self.session.close()
+
+    async def proxy(self, request, base_url, body):
+        headers = {k: v for k, v in request.headers.items() if k.lower() not in HOP_HEADERS}
+        response = None
+        try:
+            async with self.session.request(request.method, base_url + request.rel_url.path_qs,
+                                            headers=headers, data=body) as upstream:
+                response = web.StreamResponse(status=upstream.status, headers={
+                    k: v for k, v in upstream.headers.items() if k.lower() not in HOP_HEADERS
+                })
+                await response.prepare(request)
+                # Streamed through so that chunked replies reach the client as they come
+                async for chunk in upstream.content.iter_any():
+                    await response.write(chunk)
+                await response.write_eof()
+                return response
+        except (aiohttp.ClientError, asyncio.TimeoutError) as e:
+            if response is None or not response.prepared:
+                return web.json_response({"error": f"upstream unavailable: {e}"}, status=503)
+            # The status line is already out: cut the connection so that the
+            # client sees a broken reply rather than a complete short one
+            if request.transport is not None:
+                request.transport.close()
+            return response
+
+    async def handle(self, request):
+        body = await request.read()
+        sender = request.query.get("sender")
+        if sender is None and body and request.content_type == "application/json":
+            try:
+                payload = json.loads(body)
+            except ValueError:
+                payload = None
+            if isinstance(payload, dict) and payload.get("sender") is not None:
+                sender = str(payload["sender"])
+        index = sender_worker(sender, len(self.worker_urls)) if sender is not None else next(self._next_worker)
+        return await self.proxy(request, self.worker_urls[index], body)
+
+    async def handle_action(self, request):
+        return await self.proxy(request, self.action_urls[next(self._next_action)], await request.read())
+
+    async def ready(self, request):
+        async def worker_ready(url):
+            try:
+                async with self.session.get(url + "/ready", timeout=aiohttp.ClientTimeout(total=2)) as response:
+                    return await response.json(content_type=None) if response.status == 200 else None
+            except (aiohttp.ClientError, asyncio.TimeoutError, ValueError):
+                return None
+
+        workers = await asyncio.gather(*(worker_ready(url) for url in self.worker_urls))
+        ready = sum(worker is not None for worker in workers)
+        body = {"workers": len(workers), "ready": ready}
+        return web.json_response(body, status=200 if ready == len(workers) else 503)
+
+def allowed_origin(cors, origin):
+    """The Access-Control-Allow-Origin for a request from `origin`, as Rasa's --cors would send it."""
+    if cors == "*":
+        return "*"
+    return origin if origin == cors else None
+
+def cors_middleware(cors):
+    """Adds the CORS header to the router's own responses; proxied ones carry the worker's."""
+    @web.middleware
+    async def middleware(request, handler):
+        response = await handler(request)
+        origin = allowed_origin(cors, request.headers.get("Origin"))
+        if origin and not response.prepared and "Access-Control-Allow-Origin" not in response.headers:
+            response.headers["Access-Control-Allow-Origin"] = origin
+            if origin != "*":
+                response.headers["Vary"] = "Origin"
+        return response
+
+    return middleware
+
+def public_app(router, cors="*"):
+    app = web.Application(client_max_size=16 * 1024 * 1024, middlewares=[cors_middleware(cors)])
+    app.router.add_get("/ready", router.ready)
+    app.router.add_route("*", "/{tail:.*}", router.handle)
+    app.on_startup.append(router.start)
+    app.on_cleanup.append(router.close)
+    return app
+
+def action_app(router):
+    app = web.Application(client_max_size=16 * 1024 * 1024)
+    app.router.add_route("*", "/{tail:.*}", router.handle_action)
+    return app
+
+def parse_args():
+    cpus = os.cpu_count() or 1
+    parser = argparse.ArgumentParser(description="Run N Rasa workers and M action servers behind a local router.")
+    parser.add_argument("--port", type=int, default=int(os.environ.get("PORT", "5005")))
+    parser.add_argument("--workers", type=int, default=cpus)
+    parser.add_argument("--action-workers", type=int, default=max(1, cpus // 2))
+    parser.add_argument("--action-port", type=int, default=5055,
+                        help="Where the Rasa workers reach actions (the action_endpoint in endpoints.yml).")
+    parser.add_argument("--worker-base-port", type=int, default=5010)
+    parser.add_argument("--action-base-port", type=int, default=5110)
+    parser.add_argument("--model", help="Model passed on to serve.py.")
+    parser.add_argument("--cors", default="*", help="Allowed origin, passed on to serve.py and used by the router.")
+    return parser.parse_args()
+
+async def run(args):
+    worker_ports = [args.worker_base_port + i for i in range(args.workers)]
+    action_ports = [args.action_base_port + i for i in range(args.action_workers)]
+    serve = [sys.executable, "serve.py", "--endpoints", "endpoints.yml", "--cors", args.cors]
+    serve += ["--model", args.model] if args.model else []
+    processes = [Process(f"rasa worker :{port}", serve + ["--port", str(port)]) for port in worker_ports]
+    # Each action server serves its metrics on its own port, counting up from ACTION_METRICS_PORT
+    metrics_port = os.environ.get("ACTION_METRICS_PORT")
+    processes += [Process(f"action server :{port}", ["rasa", "run", "actions", "--port", str(port)],
+                          env={**os.environ, "ACTION_METRICS_PORT": str(int(metrics_port) + i)} if metrics_port else None)
+                  for i, port in enumerate(action_ports)]
+
+    router = Router([f"http://127.0.0.1:{port}" for port in worker_ports],
+                    [f"http://127.0.0.1:{port}" for port in action_ports])
+    runners = [web.AppRunner(public_app(router, args.cors)), web.AppRunner(action_app(router))]
+    for runner in runners:
+        await runner.setup()
+    await web.TCPSite(runners[0], "0.0.0.0", args.port).start()
+    await web.TCPSite(runners[1], "127.0.0.1", args.action_port).start()
+
+    stopping = asyncio.Event()
+    loop = asyncio.get_running_loop()
+    for signum in (signal.SIGINT, signal.SIGTERM):
+        loop.add_signal_handler(signum, stopping.set)
+
+    started = time.monotonic()
+    print(f"Router on :{args.port} for {len(worker_ports)} Rasa workers, "
+          f"actions on :{args.action_port} for {len(action_ports)} action servers", flush=True)
+    supervisors = [asyncio.ensure_future(process.supervise(stopping)) for process in processes]
+    try:
+        await stopping.wait()
+    finally:
+        for process in processes:
+            process.stop()
+        await asyncio.gather(*supervisors, return_exceptions=True)
+        for process in processes:
+            process.wait()
+        for runner in reversed(runners):
+            await runner.cleanup()
+        restarts = sum(process.restarts for process in processes)
+        print(f"Stopped after {time.monotonic() - started:.0f}s, {restarts} restarts", flush=True)
+
+def main():
+    args = parse_args()
+    os.chdir(BACKEND_DIR)
+    asyncio.run(run(args))
+
+if __name__ == "__main__":
+    main()
@@ -1,7 +1,17 @@
+import argparse
+import hashlib
+import os
+import time
 import pdfplumber
 import yaml
 import re
+from collections import deque
+from concurrent.futures import Future, ProcessPoolExecutor
 from pathlib import Path
+from typing import NamedTuple
+
+from augment_nlu import NLU_EXTRACTED
+
 try:
     from pdf2image import convert_from_path
     import pytesseract
@@ -9,41 +19,228 @@ try:
 except ImportError:
     OCR_AVAILABLE = False
 
-def extract_text_from_pdf(pdf_path):
+CACHE_DIR = Path(".extract_cache")
+# Responses found in the PDFs, for review before they go into domain.yml
+DOMAIN_EXTRACTED = "extracted/domain.yml"
+
+class PageRecord(NamedTuple):
+    source: str
+    page: int
+    text: str
+
+# The PDF this worker process is reading, kept open across its pages
+_open_pdf = {}
+
+def file_digest(pdf_path):
+    sha = hashlib.sha256()
+    with open(pdf_path, "rb") as f:
+        for chunk in iter(lambda: f.read(1 << 20), b""):
+            sha.update(chunk)
+    return sha.hexdigest()
+
+def page_cache_path(digest, page_number, cache_dir=CACHE_DIR):
+    return Path(cache_dir) / digest / f"{page_number:05d}.txt"
+
+def _worker_pdf(pdf_path):
+    if _open_pdf.get("path") != pdf_path:
+        if _open_pdf:
+            _open_pdf["pdf"].close()
+        _open_pdf.update(path=pdf_path, pdf=pdfplumber.open(pdf_path))
+    return _open_pdf["pdf"]
+
+def _close_worker_pdf():
+    if _open_pdf:
+        _open_pdf.pop("pdf").close()
+        _open_pdf.clear()
+
+def extract_page(task):
+    """Extracts one page, falling back to OCR for that page only when it has no text layer."""
+    pdf_path, page_number = task
     try:
-        # Try pdfplumber for text-based PDFs
-        with pdfplumber.open(pdf_path) as pdf:
-            text = ""
-            for page in pdf.pages:
-                page_text = page.extract_text()
-                if page_text:
-                    text += page_text + "\n"
-            if text.strip():
-                return text
-        # Fallback to OCR if available
-        if OCR_AVAILABLE:
-            print(f"Using OCR for {pdf_path}")
-            images = convert_from_path(pdf_path)
-            text = ""
-            for image in images:
-                text += pytesseract.image_to_string(image, lang='eng+swa') + "\n"
-            return text
-        return ""
+        page = _worker_pdf(pdf_path).pages[page_number - 1]
+        text = page.extract_text() or ""
+        page.close()
+        if not text.strip() and OCR_AVAILABLE:
+            # Render just this page so only one image is in memory at a time
+            images = convert_from_path(pdf_path, first_page=page_number, last_page=page_number)
+            text = pytesseract.image_to_string(images[0], lang='eng+swa') if images else ""
+        return text
     except Exception as e:
-        print(f"Error extracting {pdf_path}: {e}")
-        return ""
-
-def generate_nlu_data(text):
-    # Broader patterns to capture more content
-    patterns = {
-        "ask_sales_process": r"(Sales|Mchakato|Mauzo|Register|Sajili|NIDA|OTP|IMEI|STK|Loan|Customer|Portal).*?([^\n.]+)",
-        "ask_payment_methods": r"(Payment|Malipo|Lipa|M-Pesa|Bank|Cash|Loan|Installment).*?([^\n.]+)",
-        "ask_maintenance": r"(Maintenance|Matengenezo|Warranty|Waranti|Repair|Tengeneza|Service).*?([^\n.]+)",
-        "ask_lost_phone": r"(Lost|Potea|Missing|Simu\s*Iliyopotea|Stolen|Report).*?([^\n.]+)",
-        "lock_phone": r"(Lock|Kulock|V-Trust|Pay\s*Trigger|O-Guard|Trustonic|Think\s*Adams|Vivo|Tecno|Oppo|Samsung|Realme).*?([^\n.]+)",
-        "phone_pricing": r"(\w+\s*\w*)\s*[:,]\s*(\d+[,\d]*\s*TZS|Initial|Weekly|Monthly|Payment|Bei|Kianzio)"
-    }
-    
+        print(f"Error extracting {pdf_path} page {page_number}: {e}")
+        return None
+
+def cached_page(digest, page_number, cache_dir=CACHE_DIR):
+    path = page_cache_path(digest, page_number, cache_dir)
+    return path.read_text(encoding="utf-8") if path.exists() else None
+
+def should_cache(text):
+    """An empty page is only final when OCR had its chance; otherwise a later run with OCR retries it."""
+    return text is not None and (bool(text.strip()) or OCR_AVAILABLE)
+
+def store_page(digest, page_number, text, cache_dir=CACHE_DIR):
+    path = page_cache_path(digest, page_number, cache_dir)
+    path.parent.mkdir(parents=True, exist_ok=True)
+    tmp_path = path.with_suffix(f".{os.getpid()}.tmp")
+    tmp_path.write_text(text, encoding="utf-8")
+    os.replace(tmp_path, path)
+
+def find_pdfs(paths):
+    """Yields the PDFs named in `paths`, searching directories recursively."""
+    for path in map(Path, paths):
+        if path.is_dir():
+            yield from sorted(p for p in path.rglob("*") if p.suffix.lower() == ".pdf" and p.is_file())
+        elif path.exists():
+            yield path
+        else:
+            print(f"PDF not found: {path}")
+
+def _page_jobs(pdf_paths, cache_dir, stats):
+    for pdf_path in pdf_paths:
+        pdf_path = str(pdf_path)
+        try:
+            digest = file_digest(pdf_path)
+            with pdfplumber.open(pdf_path) as pdf:
+                page_count = len(pdf.pages)
+        except Exception as e:
+            print(f"Error extracting {pdf_path}: {e}")
+            continue
+        stats["pages"] = stats.get("pages", 0) + page_count
+        for number in range(1, page_count + 1):
+            yield pdf_path, digest, number, cached_page(digest, number, cache_dir)
+
+def iter_pages(pdf_paths, workers=1, cache_dir=CACHE_DIR, stats=None):
+    """Yields a PageRecord for every page of `pdf_paths`, in order.
+
+    Pages missing from the cache are extracted on a process pool. At most a
+    few pages per worker are in flight or waiting to be consumed, so memory
+    does not grow with the number or size of the PDFs.
+    """
+    stats = {} if stats is None else stats
+    pool = ProcessPoolExecutor(max_workers=workers) if workers > 1 else None
+    window = deque()
+
+    def finish(job):
+        pdf_path, digest, number, text = job
+        if isinstance(text, Future):
+            text = text.result()
+            if should_cache(text):
+                store_page(digest, number, text, cache_dir)
+        return PageRecord(pdf_path, number, text or "")
+
+    try:
+        for pdf_path, digest, number, text in _page_jobs(pdf_paths, cache_dir, stats):
+            if text is None:
+                stats["extracted"] = stats.get("extracted", 0) + 1
+                if pool:
+                    text = pool.submit(extract_page, (pdf_path, number))
+                else:
+                    text = extract_page((pdf_path, number))
+                    if should_cache(text):
+                        store_page(digest, number, text, cache_dir)
+            window.append((pdf_path, digest, number, text))
+            while len(window) > 4 * workers:
+                yield finish(window.popleft())
+        while window:
+            yield finish(window.popleft())
+    finally:
+        if pool:
+            pool.shutdown(cancel_futures=True)
+        else:
+            # Serial extraction keeps the PDF open in this process, not in a worker
+            _close_worker_pdf()
+
+# Broader keywords to capture more content. A keyword captures the rest of its
+# sentence; phone_pricing instead captures "<item>: <value>" pairs.
+INTENT_KEYWORDS = {
+    "ask_sales_process": ["Sales", "Mchakato", "Mauzo", "Register", "Sajili", "NIDA", "OTP", "IMEI", "STK", "Loan", "Customer", "Portal"],
+    "ask_payment_methods": ["Payment", "Malipo", "Lipa", "M-Pesa", "Bank", "Cash", "Loan", "Installment"],
+    "ask_maintenance": ["Maintenance", "Matengenezo", "Warranty", "Waranti", "Repair", "Tengeneza", "Service"],
+    "ask_lost_phone": ["Lost", "Potea", "Missing", r"Simu\s*Iliyopotea", "Stolen", "Report"],
+    "lock_phone": ["Lock", "Kulock", "V-Trust", r"Pay\s*Trigger", "O-Guard", "Trustonic", r"Think\s*Adams", "Vivo", "Tecno", "Oppo", "Samsung", "Realme"],
+}
+PRICE_INTENT = "phone_pricing"
+PRICE_VALUES = [r"\d+[,\d]*\s*TZS", "Initial", "Weekly", "Monthly", "Payment", "Bei", "Kianzio"]
+
+# Patterns for responses
+DOMAIN_INTENTS = {f"utter_{intent}": intent for intent in [*INTENT_KEYWORDS, PRICE_INTENT]}
+
+_WHITESPACE = re.compile(r"\s+")
+_PRICE_ITEM = re.compile(r"(\w+\s*\w*)\s*$")
+
+class MatchEngine:
+    """Finds the matches of every intent in a single scan of the text.
+
+    All keywords are compiled into one alternation. Keyword hits and price
+    separators only consume themselves and capture what follows in a
+    lookahead, so a hit inside another intent's sentence is still seen; each
+    intent then keeps its own matches non-overlapping, as a separate
+    `re.finditer` per intent would.
+    """
+
+    def __init__(self, intent_keywords=INTENT_KEYWORDS, price_values=PRICE_VALUES, price_intent=PRICE_INTENT):
+        self.price_intent = price_intent
+        self._routes = {}
+        for intent, keywords in intent_keywords.items():
+            for keyword in keywords:
+                self._routes.setdefault(self._route_key(keyword.replace("\\s*", "")), []).append(intent)
+        alternatives = sorted({k for ks in intent_keywords.values() for k in ks}, key=len, reverse=True)
+        self._pattern = re.compile(
+            rf"(?P<kw>{'|'.join(alternatives)})(?=[^\n]*?(?P<content>[^\n.]+))"
+            rf"|[:,](?=\s*(?P<value>{'|'.join(price_values)}))",
+            re.IGNORECASE,
+        )
+
+    @staticmethod
+    def _route_key(keyword):
+        return _WHITESPACE.sub("", keyword).lower()
+
+    def scan(self, text):
+        """Yields (intent, keyword, content) for every match in `text`."""
+        last_end = {}
+        for match in self._pattern.finditer(text):
+            keyword = match.group("kw")
+            if keyword is not None:
+                start, end = match.start(), match.end("content")
+                intents, content = self._routes[self._route_key(keyword)], match.group("content")
+            else:
+                item = _PRICE_ITEM.search(text, max(0, match.start() - 80), match.start())
+                if item is None:
+                    continue
+                start, end = item.start(), match.end("value")
+                keyword, content, intents = item.group(1), match.group("value"), (self.price_intent,)
+            for intent in intents:
+                if start >= last_end.get(intent, 0):
+                    last_end[intent] = end
+                    yield intent, keyword, content
+
+    def scan_records(self, records):
+        """Yields (record, matches) for a stream of PageRecords."""
+        for record in records:
+            yield record, list(self.scan(record.text))
+
+MATCH_ENGINE = MatchEngine()
+
+def collect_nlu_examples(matches, found):
+    """Adds the examples generated from `matches` to `found` (intent -> set)."""
+    for intent, keyword, content in matches:
+        examples = found.setdefault(intent, set())
+        examples.update([
+            f"What is {content}?" if intent != "phone_pricing" else f"How much is {content}?",
+            f"Tell me about {content}.",
+            f"Explain {content} in detail.",
+            f"Jinsi ya {content.lower()}?" if intent != "phone_pricing" else f"Bei ya {content} ni nini?",
+            f"Nawezaje {content.lower()}?" if intent != "phone_pricing" else f"Kiasi cha {content} ni kiasi gani?"
+        ])
+
+def collect_domain_responses(matches, found):
+    """Adds the responses found in `matches` to `found` (intent -> list)."""
+    for intent, _, content in matches:
+        found.setdefault(intent, []).extend([
+            {"text": content.strip()},
+            {"text": content.strip().lower()}  # Swahili version
+        ])
+
+def generate_nlu_data(found):
     nlu_data = {"version": "3.1", "nlu": []}
     
     # Base examples
@@ -59,18 +256,9 @@ def generate_nlu_data(text):
         "phone_pricing": ["What is the price of Tecno Camon 30S?", "How much is the initial payment for Realme C61?", "What are the weekly payments for Honor X7B?", "Tell me about ZTE A35 pricing", "How much is the monthly payment for Tecno Spark 30C?", "Bei ya simu ya Tecno ni kiasi gani?", "Kianzio cha Realme C61 ni kiasi gani?", "Malipo ya wiki ya Honor X7B?"]
     }
     
-    # Generate examples from PDFs
-    for intent, pattern in patterns.items():
-        examples = set(base_examples.get(intent, []))
-        for match in re.finditer(pattern, text, re.IGNORECASE):
-            keyword, content = match.groups()
-            examples.update([
-                f"What is {content}?" if intent != "phone_pricing" else f"How much is {content}?",
-                f"Tell me about {content}.",
-                f"Explain {content} in detail.",
-                f"Jinsi ya {content.lower()}?" if intent != "phone_pricing" else f"Bei ya {content} ni nini?",
-                f"Nawezaje {content.lower()}?" if intent != "phone_pricing" else f"Kiasi cha {content} ni kiasi gani?"
-            ])
+    # Examples generated from PDFs
+    for intent in [*INTENT_KEYWORDS, PRICE_INTENT]:
+        examples = set(base_examples.get(intent, [])) | found.get(intent, set())
         nlu_data["nlu"].append({"intent": intent, "examples": "- " + "\n- ".join(examples)})
     
     # Add static intents
@@ -79,7 +267,7 @@ def generate_nlu_data(text):
     
     return nlu_data
 
-def generate_domain_data(text):
+def generate_domain_data(found):
     # Responses
     responses = {
         "utter_greet": [
@@ -96,24 +284,8 @@ def generate_domain_data(text):
         ]
     }
     
-    # Patterns for responses
-    patterns = {
-        "utter_ask_sales_process": r"(Sales|Mchakato|Mauzo|Register|Sajili|NIDA|OTP|IMEI|STK|Loan|Customer|Portal).*?([^\n.]+)",
-        "utter_ask_payment_methods": r"(Payment|Malipo|Lipa|M-Pesa|Bank|Cash|Loan|Installment).*?([^\n.]+)",
-        "utter_ask_maintenance": r"(Maintenance|Matengenezo|Warranty|Waranti|Repair|Tengeneza|Service).*?([^\n.]+)",
-        "utter_ask_lost_phone": r"(Lost|Potea|Missing|Simu\s*Iliyopotea|Stolen|Report).*?([^\n.]+)",
-        "utter_lock_phone": r"(Lock|Kulock|V-Trust|Pay\s*Trigger|O-Guard|Trustonic|Think\s*Adams|Vivo|Tecno|Oppo|Samsung|Realme).*?([^\n.]+)",
-        "utter_phone_pricing": r"(\w+\s*\w*)\s*[:,]\s*(\d+[,\d]*\s*TZS|Initial|Weekly|Monthly|Payment|Bei|Kianzio)"
-    }
-    
-    for utter, pattern in patterns.items():
-        utter_responses = []
-        for match in re.finditer(pattern, text, re.IGNORECASE):
-            _, content = match.groups()
-            utter_responses.extend([
-                {"text": content.strip()},
-                {"text": content.strip().lower()}  # Swahili version
-            ])
+    for utter, intent in DOMAIN_INTENTS.items():
+        utter_responses = found.get(intent, [])
         responses[utter] = utter_responses or [
             {"text": f"Tafadhali toa maelezo zaidi kuhusu {utter.replace('utter_', '')}."},
             {"text": f"Please provide more details about {utter.replace('utter_', '')}."}
@@ -131,27 +303,49 @@ def generate_domain_data(text):
     return domain_data
 
 def save_yaml(data, filepath):
+    Path(filepath).parent.mkdir(parents=True, exist_ok=True)
     with open(filepath, "w", encoding="utf-8") as f:
         yaml.dump(data, f, allow_unicode=True, sort_keys=False)
     print(f"Saved {filepath}")
 
+def parse_args():
+    parser = argparse.ArgumentParser(description="Generate NLU and domain data from the sales PDFs.")
+    parser.add_argument("pdfs", nargs="*", default=["MwongozoMauzo.pdf", "vianzio.pdf"],
+                        help="PDF files or directories to search for PDFs.")
+    parser.add_argument("--workers", type=int, default=os.cpu_count() or 1,
+                        help="Processes used to extract pages (default: all cores).")
+    parser.add_argument("--cache-dir", default=str(CACHE_DIR))
+    return parser.parse_args()
+
 def main():
-    pdf_paths = ["MwongozoMauzo.pdf", "vianzio.pdf"]
-    all_text = ""
-    
-    for pdf_path in pdf_paths:
-        if Path(pdf_path).exists():
-            text = extract_text_from_pdf(pdf_path)
-            all_text += text + "\n"
-        else:
-            print(f"PDF not found: {pdf_path}")
-    
-    if all_text:
-        nlu_data = generate_nlu_data(all_text)
-        domain_data = generate_domain_data(all_text)
+    args = parse_args()
+    nlu_examples, domain_responses = {}, {}
+    stats = {}
+    started = time.perf_counter()
+
+    # Pages are consumed as they arrive and scanned once; only the matches are kept
+    pages_with_text = 0
+    records = iter_pages(find_pdfs(args.pdfs), args.workers, args.cache_dir, stats)
+    for record, matches in MATCH_ENGINE.scan_records(records):
+        if record.text.strip():
+            pages_with_text += 1
+            collect_nlu_examples(matches, nlu_examples)
+            collect_domain_responses(matches, domain_responses)
+
+    elapsed = time.perf_counter() - started
+    if stats:
+        print(f"Extracted {stats['pages']} pages ({stats.get('extracted', 0)} not cached) in {elapsed:.1f}s, "
+              f"{stats['pages'] / max(elapsed, 1e-9):.1f} pages/s with {args.workers} workers")
+
+    if pages_with_text:
+        nlu_data = generate_nlu_data(nlu_examples)
+        domain_data = generate_domain_data(domain_responses)
         
-        save_yaml(nlu_data, "data/nlu.yml")
-        save_yaml(domain_data, "domain.yml")
+        # Generated files only: nlu.base.yml and domain.yml are written by hand.
+        # augment_nlu.py merges these examples into data/nlu.yml; responses are
+        # copied from the generated domain into domain.yml after review.
+        save_yaml(nlu_data, NLU_EXTRACTED)
+        save_yaml(domain_data, DOMAIN_EXTRACTED)
     else:
         print("No text extracted from PDFs.")
 
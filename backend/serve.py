@@ -0,0 +1,167 @@
+"""Starts the Rasa server so that it answers health checks before the model is loaded.
+
+`rasa run` loads the model before it binds the port, so a cold container
+refuses connections until TensorFlow is imported, the archive is unpacked and
+DIET has been built. Here the port is bound first; the heavy modules are
+imported in a thread, the model is loaded in the background and a first parse
+warms the pipeline. GET /ready reports the Rasa model and the action server:
+
+    200 {"rasa": "ready", "actions": "ready", ...}   once both can answer
+    503 {"rasa": "loading", ...}                     while starting up
+
+Run from the backend directory, next to `rasa run actions`:
+
+    python serve.py --port $PORT [--model models/...tar.gz]
+    python serve.py --warmup-only    # smoke check: load and parse once, then exit
+"""
+import argparse
+import asyncio
+import importlib
+import logging
+import os
+import sys
+import time
+from pathlib import Path
+
+BACKEND_DIR = Path(__file__).resolve().parent
+DEFAULT_MODEL = "models/core-20250624-001111-red-yard.tar.gz"
+WARMUP_MESSAGE = "habari"
+
+# Imported by the model's graph on load; importing them first, off the event
+# loop, keeps /ready responsive during the slowest part of startup.
+HEAVY_MODULES = [
+    "tensorflow",
+    "rasa.nlu.classifiers.diet_classifier",
+    "rasa.nlu.featurizers.sparse_featurizer.count_vectors_featurizer",
+    "rasa.nlu.featurizers.sparse_featurizer.lexical_syntactic_featurizer",
+    "rasa.core.policies.rule_policy",
+]
+
+logger = logging.getLogger(__name__)
+
+def preload_modules():
+    for name in HEAVY_MODULES:
+        importlib.import_module(name)
+
+async def load_warm_agent(model_path, endpoints):
+    """Loads the agent and parses one message so the first real reply is not the slow one."""
+    from rasa.core.agent import load_agent
+
+    await asyncio.get_running_loop().run_in_executor(None, preload_modules)
+    agent = await load_agent(model_path=model_path, endpoints=endpoints)
+    if not agent.is_ready():
+        raise RuntimeError(f"Could not load model {model_path}")
+    await agent.parse_message(WARMUP_MESSAGE)
+    return agent
+
+def action_health_url(endpoints):
+    if endpoints is None or endpoints.action is None or not endpoints.action.url:
+        return None
+    return endpoints.action.url.rsplit("/", 1)[0] + "/health"
+
+class Readiness:
+    def __init__(self, action_health):
+        self.action_health = action_health
+        self.started = time.monotonic()
+        self.status = "loading"
+        self.ready_after = None
+        self.error = None
+
+    async def load(self, app, model_path, endpoints):
+        try:
+            app.ctx.agent = await load_warm_agent(model_path, endpoints)
+        except Exception as e:
+            logger.exception("Failed to load %s", model_path)
+            self.status, self.error = "failed", str(e)
+            return
+        self.status = "ready"
+        self.ready_after = round(time.monotonic() - self.started, 2)
+        logger.info("Model loaded and warmed in %.1fs", self.ready_after)
+
+    async def actions_status(self):
+        if self.action_health is None:
+            return "not configured"
+        import aiohttp
+
+        try:
+            async with aiohttp.ClientSession(timeout=aiohttp.ClientTimeout(total=1)) as session:
+                async with session.get(self.action_health) as response:
+                    return "ready" if response.status == 200 else f"http {response.status}"
+        except (aiohttp.ClientError, asyncio.TimeoutError):
+            return "unreachable"
+
+    async def handle(self, request):
+        from sanic import response
+
+        actions = await self.actions_status()
+        body = {
+            "rasa": self.status,
+            "actions": actions,
+            "uptime": round(time.monotonic() - self.started, 2),
+            "ready_after": self.ready_after,
+        }
+        if self.error:
+            body["error"] = self.error
+        ready = self.status == "ready" and actions in ("ready", "not configured")
+        return response.json(body, status=200 if ready else 503)
+
+def create_app(model_path, endpoints_path, credentials_path, cors):
+    from rasa.core import run
+    from rasa.core.agent import Agent
+    from rasa.core.utils import AvailableEndpoints
+
+    endpoints = AvailableEndpoints.read_endpoints(endpoints_path)
+    input_channels = run.create_http_input_channels(None, credentials_path)
+    app = run.configure_app(input_channels, cors=cors, enable_api=True, endpoints=endpoints)
+    # An agent without a model ignores messages until the real one is swapped in
+    app.ctx.agent = Agent()
+
+    readiness = Readiness(action_health_url(endpoints))
+    app.add_route(readiness.handle, "/ready", methods=["GET"])
+
+    async def start_loading(app, loop):
+        app.add_task(readiness.load(app, model_path, endpoints))
+
+    app.register_listener(start_loading, "after_server_start")
+    app.register_listener(run.close_resources, "after_server_stop")
+    return app
+
+def warmup_only(model_path, endpoints_path):
+    from rasa.core.utils import AvailableEndpoints
+
+    endpoints = AvailableEndpoints.read_endpoints(endpoints_path)
+    # A smoke check keeps its one conversation in memory instead of creating the tracker database
+    endpoints.tracker_store = None
+    started = time.perf_counter()
+    asyncio.run(load_warm_agent(model_path, endpoints))
+    print(f"Loaded and warmed {model_path} in {time.perf_counter() - started:.1f}s")
+
+def parse_args():
+    parser = argparse.ArgumentParser(description="Run the Rasa server with a /ready endpoint.")
+    parser.add_argument("--model", default=os.environ.get("RASA_MODEL", DEFAULT_MODEL))
+    parser.add_argument("--port", type=int, default=int(os.environ.get("PORT", "5005")))
+    parser.add_argument("--endpoints", default="endpoints.yml")
+    parser.add_argument("--credentials", default="credentials.yml")
+    parser.add_argument("--cors", default="*")
+    parser.add_argument("--warmup-only", action="store_true",
+                        help="Smoke check: load the model and parse one message, then exit. Nothing is persisted.")
+    return parser.parse_args()
+
+def main():
+    args = parse_args()
+    os.chdir(BACKEND_DIR)
+    logging.basicConfig(level=logging.INFO)
+
+    if args.warmup_only:
+        try:
+            warmup_only(args.model, args.endpoints)
+        except Exception as e:
+            print(f"Warm-up failed: {e}")
+            sys.exit(1)
+        return
+
+    app = create_app(args.model, args.endpoints, args.credentials, args.cors)
+    app.run(host="0.0.0.0", port=args.port, workers=1, access_log=False)
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,198 @@
+"""Tracker store kept in a local SQLite file with a small in-memory hot cache.
+
+The default in-memory store keeps every conversation, with every event, for
+as long as the server runs. This store keeps only what the bot can still use:
+
+- conversations idle for longer than the session expiration time (from the
+  domain's session_config unless `ttl_minutes` is given) are deleted;
+- a saved tracker is compacted to its last session, and to at most
+  `max_events` events, with the slots set before the cut carried over;
+- only the `cache_size` most recently used conversations stay in memory.
+
+Configured in endpoints.yml:
+
+    tracker_store:
+      type: stores.tracker.LocalTrackerStore
+      db: trackers.sqlite
+"""
+import json
+import logging
+import os
+import sqlite3
+import time
+from collections import OrderedDict
+from typing import Any, Dict, Iterable, List, Optional, Text, Tuple
+
+from rasa.core.brokers.broker import EventBroker
+from rasa.core.tracker_store import TrackerStore
+from rasa.shared.core.constants import ACTION_SESSION_START_NAME
+from rasa.shared.core.domain import Domain
+from rasa.shared.core.trackers import DialogueStateTracker
+
+logger = logging.getLogger(__name__)
+
+DEFAULT_TTL_MINUTES = 60.0
+SWEEP_INTERVAL_SECONDS = 60.0
+
+
+def _is_session_start(event: Dict[Text, Any]) -> bool:
+    return event.get("event") == "action" and event.get("name") == ACTION_SESSION_START_NAME
+
+
+def compact_events(events: List[Dict[Text, Any]], max_events: int) -> List[Dict[Text, Any]]:
+    """Keeps the last session and, past `max_events`, its start plus the latest turns.
+
+    Slots set in the dropped turns are re-set right after the session start
+    so the compacted tracker ends in the same state as the full one.
+    """
+    start = next((i for i in range(len(events) - 1, -1, -1) if _is_session_start(events[i])), 0)
+    events = events[start:]
+    if len(events) <= max_events:
+        return events
+
+    # The session start and its session_started event head the compacted tracker
+    header = events[:2] if events and _is_session_start(events[0]) else []
+    cut = len(events) - (max_events - len(header))
+    # Start the kept part at a user turn when there is one
+    cut = next((i for i in range(cut, len(events)) if events[i].get("event") == "user"), cut)
+
+    slots: Dict[Text, Any] = {}
+    for event in events[len(header):cut]:
+        if event.get("event") == "slot":
+            slots[event["name"]] = event.get("value")
+        elif event.get("event") in ("reset_slots", "restart"):
+            slots.clear()
+    timestamp = events[cut]["timestamp"] if cut < len(events) else time.time()
+    carried = [{"event": "slot", "timestamp": timestamp, "name": name, "value": value}
+               for name, value in slots.items()]
+    return header + carried + events[cut:]
+
+
+class LocalTrackerStore(TrackerStore):
+    def __init__(
+        self,
+        domain: Optional[Domain] = None,
+        event_broker: Optional[EventBroker] = None,
+        db: Text = "trackers.sqlite",
+        ttl_minutes: Optional[float] = None,
+        cache_size: int = 256,
+        max_events: int = 200,
+        **kwargs: Any,
+    ) -> None:
+        super().__init__(domain, event_broker, **kwargs)
+        self.db_path = db
+        self.ttl_minutes = None if ttl_minutes is None else float(ttl_minutes)
+        self.cache_size = int(cache_size)
+        self.max_events = int(max_events)
+        self.evicted = 0
+        self.compacted = 0
+        self._cache: "OrderedDict[Text, Tuple[float, Text]]" = OrderedDict()
+        self._next_sweep = time.monotonic() + SWEEP_INTERVAL_SECONDS
+
+        self._db = sqlite3.connect(db, check_same_thread=False)
+        self._db.execute("PRAGMA journal_mode=WAL")
+        self._db.execute("PRAGMA synchronous=NORMAL")
+        self._db.execute(
+            "CREATE TABLE IF NOT EXISTS trackers (sender_id TEXT PRIMARY KEY, updated_at REAL NOT NULL, events TEXT NOT NULL)"
+        )
+        self._db.execute("CREATE INDEX IF NOT EXISTS trackers_updated_at ON trackers (updated_at)")
+        self._db.commit()
+
+    @property
+    def ttl(self) -> float:
+        """Seconds a conversation may stay idle before it is deleted.
+
+        Read from the domain on every use: Rasa creates the store without a
+        domain and only assigns the real one after loading the model.
+        """
+        if self.ttl_minutes is not None:
+            return self.ttl_minutes * 60
+        expiration = self.domain.session_config.session_expiration_time
+        return (expiration if expiration and expiration > 0 else DEFAULT_TTL_MINUTES) * 60
+
+    def _remember(self, sender_id: Text, updated_at: float, events: Text) -> None:
+        self._cache[sender_id] = (updated_at, events)
+        self._cache.move_to_end(sender_id)
+        while len(self._cache) > self.cache_size:
+            self._cache.popitem(last=False)
+
+    def _load(self, sender_id: Text) -> Optional[Tuple[float, Text]]:
+        entry = self._cache.get(sender_id)
+        if entry is not None:
+            self._cache.move_to_end(sender_id)
+            return entry
+        row = self._db.execute("SELECT updated_at, events FROM trackers WHERE sender_id = ?", (sender_id,)).fetchone()
+        if row is not None:
+            self._remember(sender_id, row[0], row[1])
+        return row
+
+    async def save(self, tracker: DialogueStateTracker) -> None:
+        if self.event_broker:
+            await self.stream_events(tracker)
+
+        events = [event.as_dict() for event in tracker.events]
+        compacted = compact_events(events, self.max_events)
+        self.compacted += len(events) - len(compacted)
+        serialised = json.dumps(compacted)
+        updated_at = time.time()
+
+        self._db.execute(
+            "INSERT OR REPLACE INTO trackers (sender_id, updated_at, events) VALUES (?, ?, ?)",
+            (tracker.sender_id, updated_at, serialised),
+        )
+        self._db.commit()
+        self._remember(tracker.sender_id, updated_at, serialised)
+        self._maybe_sweep()
+
+    async def retrieve(self, sender_id: Text) -> Optional[DialogueStateTracker]:
+        entry = self._load(sender_id)
+        if entry is None:
+            return None
+        updated_at, serialised = entry
+        if updated_at < time.time() - self.ttl:
+            await self.delete(sender_id)
+            self.evicted += 1
+            return None
+        return DialogueStateTracker.from_dict(sender_id, json.loads(serialised), self.domain.slots)
+
+    async def retrieve_full_tracker(self, conversation_id: Text) -> Optional[DialogueStateTracker]:
+        # Only the compacted last session is kept
+        return await self.retrieve(conversation_id)
+
+    async def keys(self) -> Iterable[Text]:
+        return [row[0] for row in self._db.execute("SELECT sender_id FROM trackers")]
+
+    async def delete(self, sender_id: Text) -> None:
+        self._cache.pop(sender_id, None)
+        self._db.execute("DELETE FROM trackers WHERE sender_id = ?", (sender_id,))
+        self._db.commit()
+
+    def _maybe_sweep(self) -> None:
+        if time.monotonic() < self._next_sweep:
+            return
+        self._next_sweep = time.monotonic() + SWEEP_INTERVAL_SECONDS
+        self.sweep()
+        logger.info("Tracker store: %s", self.stats())
+
+    def sweep(self) -> int:
+        """Deletes every conversation idle for longer than the TTL; returns how many."""
+        cutoff = time.time() - self.ttl
+        expired = [row[0] for row in self._db.execute("SELECT sender_id FROM trackers WHERE updated_at < ?", (cutoff,))]
+        if expired:
+            self._db.execute("DELETE FROM trackers WHERE updated_at < ?", (cutoff,))
+            self._db.commit()
+            for sender_id in expired:
+                self._cache.pop(sender_id, None)
+        self.evicted += len(expired)
+        return len(expired)
+
+    def stats(self) -> Dict[Text, Any]:
+        sessions = self._db.execute("SELECT COUNT(*) FROM trackers").fetchone()[0]
+        return {
+            "sessions": sessions,
+            "cached_sessions": len(self._cache),
+            "cache_bytes": sum(len(events) for _, events in self._cache.values()),
+            "db_bytes": os.path.getsize(self.db_path) if os.path.exists(self.db_path) else 0,
+            "evicted": self.evicted,
+            "compacted_events": self.compacted,
+        }
@@ -0,0 +1,77 @@
+"""Budget parsing of backend/actions/affordability.py. Run from the repository root:
+
+    python -m pytest tests/test_affordability.py
+"""
+import sys
+from pathlib import Path
+
+import pytest
+
+sys.path.insert(0, str(Path(__file__).resolve().parents[1] / "backend"))
+
+from actions.affordability import AffordabilityIndex, parse_budget  # noqa: E402
+from actions.catalog import PhoneCatalog  # noqa: E402
+
+PRICES = {
+    "tecno spark 20": {"brand": "tecno", "lock_solution": "Pay Trigger",
+                       "bei": 300000, "kianzio": 90000, "siku": 1700, "wiki": 11900, "mwezi": 51000},
+    "oppo a18 4/64gb": {"brand": "oppo", "lock_solution": "O-Guard",
+                        "bei": 350000, "kianzio": 105000, "siku": 2000, "wiki": 14000, "mwezi": 60000},
+}
+
+
+@pytest.fixture
+def catalog():
+    return PhoneCatalog(PRICES, version="test")
+
+
+@pytest.mark.parametrize("text, limits", [
+    ("Simu gani kwa kianzio cha 100,000 na 15,000 kwa wiki?", {"kianzio": 100000, "wiki": 15000}),
+    ("which phone with a 100k deposit and 15,000 a week", {"kianzio": 100000, "wiki": 15000}),
+    ("Nina elfu 90 ya vianzio", {"kianzio": 90000}),
+    ("2,000 daily", {"siku": 2000}),
+    ("monthly payments below 70,000", {"mwezi": 70000}),
+    ("Bajeti yangu ni 300,000", {"bei": 300000}),
+])
+def test_amounts_limit_the_field_named_next_to_them(catalog, text, limits):
+    assert parse_budget(text, catalog).limits == limits
+
+
+@pytest.mark.parametrize("text", [
+    "download the app, 300,000",
+    "simu kuanzia 300,000",
+    "weekend offer 300,000",
+    "dayton 300,000",
+    "pricey 300,000",
+])
+def test_words_that_only_start_like_a_field_set_the_cash_price(catalog, text):
+    assert parse_budget(text, catalog).limits == {"bei": 300000}
+
+
+def test_small_number_next_to_a_period_is_a_term(catalog):
+    budget = parse_budget("kianzio 50,000 na 2,000 kwa siku kwa miezi 6", catalog)
+    assert budget.limits == {"kianzio": 50000, "siku": 2000}
+    assert budget.days == 180
+
+
+def test_search_applies_every_limit_and_the_brand(catalog):
+    index = AffordabilityIndex(catalog)
+    assert index.search({"kianzio": 100000}) == ["tecno spark 20"]
+    assert index.search({"bei": 400000}, brand="oppo") == ["oppo a18 4/64gb"]
+    assert index.search({"bei": 400000, "wiki": 12000}) == ["tecno spark 20"]
+
+
+def test_a_stated_term_does_not_widen_the_results(catalog):
+    index = AffordabilityIndex(catalog)
+    without_term = parse_budget("kianzio 20,000", catalog)
+    with_term = parse_budget("kianzio 20,000 kwa miezi 6", catalog)
+    schedule = index.installments(with_term.limits.get("kianzio"), with_term.days)
+    assert index.search(without_term.limits) == []
+    assert index.search(with_term.limits, schedule=schedule) == []
+
+
+def test_a_down_payment_is_never_below_the_catalog_kianzio(catalog):
+    index = AffordabilityIndex(catalog)
+    schedule = index.installments(100000, 180)
+    assert list(schedule.kianzio) == [100000, 105000]
+    assert index.search({"kianzio": 100000}, schedule=schedule) == ["tecno spark 20"]
@@ -0,0 +1,62 @@
+"""Routing of backend/channels/fast_path.py. Run from the repository root:
+
+    python -m pytest tests/test_fast_path.py
+"""
+import sys
+from pathlib import Path
+
+import pytest
+
+sys.path.insert(0, str(Path(__file__).resolve().parents[1] / "backend"))
+
+from actions.catalog import PhoneCatalog  # noqa: E402
+from channels.fast_path import LOCK_INTENT, PRICE_INTENT, route  # noqa: E402
+
+PRICES = {
+    "oppo a18 4/64gb": {"brand": "oppo", "lock_solution": "O-Guard",
+                        "bei": 350000, "kianzio": 105000, "siku": 2000, "wiki": 14000, "mwezi": 60000},
+    "vivo y03 4/64gb": {"brand": "vivo", "lock_solution": "Vivo Lock",
+                        "bei": 320000, "kianzio": 96000, "siku": 1800, "wiki": 12600, "mwezi": 54000},
+    "samsung a05 4/64gb": {"brand": "samsung", "lock_solution": "Knox Guard",
+                           "bei": 380000, "kianzio": 114000, "siku": 2200, "wiki": 15400, "mwezi": 66000},
+    "tecno spark 30c 128gb/4gb": {"brand": "tecno", "lock_solution": "Pay Trigger",
+                                  "bei": 330000, "kianzio": 99000, "siku": 1900, "wiki": 13300, "mwezi": 57000},
+}
+
+
+@pytest.fixture
+def catalog():
+    return PhoneCatalog(PRICES, version="test")
+
+
+@pytest.mark.parametrize("text, model", [
+    ("OPPO A18 4/64GB", "oppo a18 4/64gb"),
+    ("Nataka oppo a18 4/64gb", "oppo a18 4/64gb"),
+    ("Bei ya vivo y03 4/64gb ni ngapi?", "vivo y03 4/64gb"),
+    ("Samsung A05 4/64GB inauzwa kiasi gani kwa sasa hapa dukani?", "samsung a05 4/64gb"),
+])
+def test_a_model_name_or_a_price_word_routes_to_the_price(catalog, text, model):
+    fast_path = route(text, catalog)
+    assert fast_path.intent == PRICE_INTENT
+    assert fast_path.entities == {"phone_model": model}
+
+
+@pytest.mark.parametrize("text", [
+    "Simu ya mteja oppo a18 4/64gb imepotea, nifanye nini?",
+    "Matengenezo ya vivo y03 4/64gb yanafanyika wapi?",
+    "Je, simu ya Samsung A05 4/64GB ina waranti?",
+    "Jinsi ya kulipa mkopo wa tecno spark 30c 128gb/4gb",
+])
+def test_other_questions_about_a_model_go_through_nlu(catalog, text):
+    assert route(text, catalog) is None
+
+
+def test_a_brand_next_to_a_lock_word_routes_to_the_lock(catalog):
+    fast_path = route("Je, oppo inalock?", catalog)
+    assert fast_path.intent == LOCK_INTENT
+    assert fast_path.entities == {"phone_brand": "oppo"}
+
+
+@pytest.mark.parametrize("text", ["Tecno kwa kianzio cha 100,000", "Bei na lock ya oppo", "/greet"])
+def test_budgets_mixed_questions_and_intents_are_left_alone(catalog, text):
+    assert route(text, catalog) is None